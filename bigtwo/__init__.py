@@ -0,0 +1,6 @@
+"""
+Shared card, trick and hand machinery for the big two bots and match tools.
+
+Cards are plain integer values from 0 to 51 ordered from 3D up to 2S, and
+sets of cards are 52-bit integer masks with bit ``value`` set for each card.
+"""
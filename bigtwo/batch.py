@@ -0,0 +1,70 @@
+"""
+Vectorised trick classification for bulk offline analysis. Requires numpy.
+
+Tricks are rows of an ``(N, k)`` integer array of card values. Results agree
+with ``tricks.classify`` and ``tricks.strength_key`` row for row.
+"""
+
+import itertools
+
+import numpy as np
+
+from bigtwo.tricks import SINGLE, PAIR, TRIPLE, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH, INVALID
+
+
+def evaluate(cards):
+    """
+    Return the trick types and strength keys of every row of card values.
+
+    Rows must hold distinct cards. Rows that are not a legal trick get the type
+    ``INVALID`` and a key built from their highest card, as ``classify`` does.
+    """
+    cards = np.sort(np.asarray(cards, dtype=np.int16), axis=1)
+    size = cards.shape[1]
+    ranks = cards // 4
+    suits = cards % 4
+    deciding = cards[:, -1].copy()
+    kinds = np.full(len(cards), INVALID, dtype=np.int16)
+
+    # every card sharing one rank makes a single, pair or triple
+    same_rank = (ranks == ranks[:, :1]).all(axis=1)
+    if size <= 3:
+        kinds[same_rank] = [SINGLE, PAIR, TRIPLE][size - 1]
+
+    elif size == 5:
+        # rank histograms find full houses and four of a kinds
+        counts = (ranks[:, :, None] == np.arange(13)).sum(axis=1)
+        most = counts.max(axis=1)
+        distinct = (counts > 0).sum(axis=1)
+        full_house = (most == 3) & (distinct == 2)
+        four = most == 4
+        kinds[full_house] = FULL_HOUSE
+        kinds[four] = FOUR_OF_A_KIND
+
+        # their deciding card is the highest card of the triple or the four
+        grouped = full_house | four
+        group_rank = counts.argmax(axis=1)
+        in_group = ranks == group_rank[:, None]
+        deciding[grouped] = np.where(in_group, cards, -1).max(axis=1)[grouped]
+
+        straight = (distinct == 5) & (ranks[:, -1] - ranks[:, 0] == 4)
+        flush = (suits == suits[:, :1]).all(axis=1)
+        kinds[straight] = STRAIGHT
+        kinds[flush] = FLUSH
+        kinds[straight & flush] = STRAIGHT_FLUSH
+
+    keys = kinds.astype(np.int32) << 8 | deciding
+    # flushes compare by the suit of their deciding card first
+    flush_rows = kinds == FLUSH
+    keys[flush_rows] = FLUSH << 8 | (deciding % 4 * 52 + deciding)[flush_rows]
+    return kinds, keys
+
+
+def hand_combinations(hands, size):
+    """
+    Expand an ``(N, h)`` array of hands into every ``size`` card combination of
+    each hand, returned as an ``(N * C(h, size), size)`` array.
+    """
+    hands = np.asarray(hands)
+    columns = np.array(list(itertools.combinations(range(hands.shape[1]), size)), dtype=np.intp)
+    return hands[:, columns].reshape(-1, size)
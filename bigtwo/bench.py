@@ -0,0 +1,196 @@
+"""
+Decision latency benchmark for the play functions of every bot.
+
+Decision points are recorded from seeded matches of each stage, sorted into
+categories such as starting a trick, beating a pair or playing late in a
+round, and can be saved as a JSON corpus so later runs time the very same
+calls. Each bot of a stage is then timed on every decision point of that
+stage, and the median, 99th percentile and maximum latency and the peak
+traced bytes per call, the most memory a call held above what was live when
+it started, are written out as JSON for comparing runs. tracemalloc only sees
+live memory, so this is not a count of every allocation a call makes.
+"""
+
+import argparse
+import copy
+import glob
+import json
+import math
+import os
+import platform
+import time
+import tracemalloc
+
+from bigtwo.engine import STAGES, load_player, play_match
+from bigtwo.knowledge import RoundHistory
+
+# the bots that play the recorded matches of each stage, as in match.py
+RECORDING_PLAYERS = {
+    "single": ["single/reserve_card.py:86", "single/balance.py", "single/charge.py", "single/simple.py"],
+    "triple": ["triple/reserve_card.py", "triple/organise.py", "triple/balance.py", "triple/reserve_card.py"],
+    "full": ["full/decomposer.py", "full/simple.py", "full/single_first.py", "full/simple.py"],
+}
+
+# bots whose play function needs a testing value, with the one match.py uses
+TEST_VALUES = {"single/reserve_card.py": 86}
+
+CATEGORIES = ["start", "single", "pair", "triple", "five", "late"]
+STAGE_CATEGORIES = {
+    "single": ["start", "single", "late"],
+    "triple": ["start", "single", "pair", "triple", "late"],
+    "full": CATEGORIES,
+}
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+
+def category(hand_sizes, play_to_beat):
+    if min(hand_sizes) <= 3:
+        return "late"
+    if not play_to_beat:
+        return "start"
+    return {1: "single", 2: "pair", 3: "triple"}.get(len(play_to_beat), "five")
+
+
+def record_corpus(stage, per_category=100, seed=0, max_rounds=500):
+    """
+    Return up to ``per_category`` decision points of each category, recorded
+    from seeded matches of a stage, as lists of ``play`` arguments.
+    """
+    corpus = {name: [] for name in STAGE_CATEGORIES[stage]}
+
+    def recording(play):
+        def recorded(*args):
+            points = corpus[category(args[5], args[2])]
+            if len(points) < per_category:
+                points.append(copy.deepcopy(list(args[:8])))
+            return play(*args)
+        return recorded
+
+    players = [recording(load_player(os.path.join(ROOT, spec))) for spec in RECORDING_PLAYERS[stage]]
+    for match_no in range(0, max_rounds, 10):
+        play_match(players, STAGES[stage], 10, "{}/{}".format(seed, match_no))
+        if all(len(points) == per_category for points in corpus.values()):
+            break
+    return corpus
+
+
+def stage_bots(stage):
+    bots = []
+    for path in sorted(glob.glob(os.path.join(ROOT, stage, "*.py"))):
+        name = stage + '/' + os.path.basename(path)
+        if not name.endswith("/match.py"):
+            bots.append(name + (":{}".format(TEST_VALUES[name]) if name in TEST_VALUES else ""))
+    return bots
+
+
+def percentile(ordered, fraction):
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarise(latencies):
+    ordered = sorted(latencies)
+    return {"calls": len(ordered), "median_us": percentile(ordered, .5) / 1000,
+            "p99_us": percentile(ordered, .99) / 1000, "max_us": ordered[-1] / 1000}
+
+
+def _arguments(point):
+    # fresh copies for every call, with the history the engine would pass
+    hand, is_start_of_round, play_to_beat, history, player_no, hand_sizes, scores, round_no = point
+    return [list(hand), is_start_of_round, list(play_to_beat), RoundHistory(copy.deepcopy(history)), player_no,
+            list(hand_sizes), list(scores), round_no]
+
+
+def benchmark(spec, corpus, repeat=1):
+    """
+    Time a bot on every decision point of a corpus and return its latency
+    summary overall and per category, and its peak traced bytes per call.
+    """
+    play = load_player(os.path.join(ROOT, spec))
+    results = {"bot": spec, "categories": {}}
+    every = []
+    for name, points in corpus.items():
+        latencies = []
+        for point in points:
+            for _ in range(repeat):
+                args = _arguments(point)
+                started = time.perf_counter_ns()
+                play(*args)
+                latencies.append(time.perf_counter_ns() - started)
+        if latencies:
+            results["categories"][name] = summarise(latencies)
+            every.extend(latencies)
+    results.update(summarise(every))
+
+    # allocations are traced in a separate pass, as tracing slows every call down, so bots
+    # with caches see them warm here
+    peaks = []
+    tracemalloc.start()
+    try:
+        for points in corpus.values():
+            for point in points:
+                args = _arguments(point)
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                play(*args)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+    results["peak_traced_bytes_median"] = percentile(peaks, .5)
+    results["peak_traced_bytes_max"] = peaks[-1]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the play function of every bot on recorded decision points.")
+    parser.add_argument("stages", nargs='*', help="stages to time, default all of them")
+    parser.add_argument("-c", "--corpus", help="JSON corpus to load, with missing stages recorded and saved there")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="JSON", help="earlier results to compare medians and p99 with")
+    parser.add_argument("--per-category", type=int, default=100, help="decision points of each category")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="times each decision point is played")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    for stage in args.stages:
+        if stage not in STAGES:
+            parser.error("unknown stage {!r}".format(stage))
+
+    stages = args.stages or sorted(STAGES)
+    corpora = {}
+    if args.corpus and os.path.exists(args.corpus):
+        with open(args.corpus) as file:
+            corpora = json.load(file)
+    # only the stages asked for are recorded, adding them to the saved corpus
+    missing = [stage for stage in stages if stage not in corpora]
+    if missing:
+        corpora.update((stage, record_corpus(stage, args.per_category, args.seed)) for stage in missing)
+        if args.corpus:
+            with open(args.corpus, 'w') as file:
+                json.dump(corpora, file)
+
+    earlier = {}
+    if args.compare:
+        with open(args.compare) as file:
+            earlier = {result["bot"]: result for result in json.load(file)["results"]}
+
+    results = []
+    for stage in stages:
+        for spec in stage_bots(stage):
+            result = benchmark(spec, corpora[stage], args.repeat)
+            results.append(result)
+            line = "{:<36} median {:8.1f}us  p99 {:9.1f}us  max {:9.1f}us  peak traced {:7d}B".format(
+                spec, result["median_us"], result["p99_us"], result["max_us"], result["peak_traced_bytes_median"])
+            if spec in earlier:
+                line += "  median x{:.2f} p99 x{:.2f}".format(result["median_us"] / earlier[spec]["median_us"],
+                                                            result["p99_us"] / earlier[spec]["p99_us"])
+            print(line)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "seed": args.seed,
+                       "repeat": args.repeat, "results": results}, file, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Time budget for the decisions of a bot.
+
+``TimeBudget`` wraps a play function so that every call returns within a
+deadline. A cheap legal play is worked out first, the bot then runs on a
+worker thread, and when it is not done in time the cheap play is returned
+instead and the timeout counted. Bots keep state between calls, so each
+bot has a single worker, shared by its wrappers in every seat as the seats
+share the module and its caches, and a late call finishes before the next
+call to that bot starts; the next call falls back too if that takes up its
+budget. State that different bots share is not guarded.
+"""
+
+import concurrent.futures
+import copy
+import functools
+import time
+
+from bigtwo.cards import to_cards, to_mask
+from bigtwo.moves import Moves
+
+
+def fallback_play(hand, is_start_of_round, play_to_beat):
+    """
+    Return the lowest single when starting a trick, which holds the 3D at the
+    start of a round, or else the weakest play that beats ``play_to_beat``,
+    or a pass if there is none.
+    """
+    mask = to_mask(hand)
+    if not play_to_beat:
+        return to_cards(mask & -mask) if mask else []
+    beating = Moves(mask).index().smallest_beating(to_mask(play_to_beat))
+    return to_cards(beating) if beating else []
+
+
+class TimeBudget:
+    """
+    A play function that answers within ``budget`` seconds, counting the calls
+    that fell back to ``fallback`` because the bot timed out or raised.
+    """
+
+    # the bot's own play function to its worker and the number of wrappers using it
+    workers = {}
+
+    def __init__(self, play, budget=1.0, fallback=fallback_play):
+        self.play = play
+        self.budget = budget
+        self.fallback = fallback
+        self.bot = _bot_play(play)
+        if self.bot not in self.workers:
+            self.workers[self.bot] = [concurrent.futures.ThreadPoolExecutor(max_workers=1), 0]
+        self.workers[self.bot][1] += 1
+        self.executor = self.workers[self.bot][0]
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def __call__(self, hand, is_start_of_round, play_to_beat, round_history, *args):
+        deadline = time.perf_counter() + self.budget
+        self.calls += 1
+        fallback = self.fallback(hand, is_start_of_round, play_to_beat)
+        # the bot may still be reading its inputs after we answered, so it gets its own copies
+        future = self.executor.submit(self.play, list(hand), is_start_of_round, list(play_to_beat),
+                                      copy.deepcopy(round_history), *copy.deepcopy(args))
+        try:
+            return future.result(timeout=max(0, deadline - time.perf_counter()))
+        except concurrent.futures.TimeoutError:
+            self.timeouts += 1
+        except Exception:
+            self.errors += 1
+        return fallback
+
+    def stats(self):
+        return {"calls": self.calls, "timeouts": self.timeouts, "errors": self.errors,
+                "timeout_rate": self.timeouts / self.calls if self.calls else 0}
+
+    def close(self):
+        if self.executor is None:
+            return
+        self.executor = None
+        self.workers[self.bot][1] -= 1
+        if not self.workers[self.bot][1]:
+            self.workers.pop(self.bot)[0].shutdown(wait=False)
+
+
+def _bot_play(play):
+    # the play function under the partials load_player wraps around it for test values and keyword arguments
+    while isinstance(play, functools.partial):
+        play = play.args[0] if play.args and callable(play.args[0]) else play.func
+    return play
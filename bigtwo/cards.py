@@ -0,0 +1,137 @@
+"""
+Card values, lookup tables and the bitmask backed ``CardSet``.
+"""
+
+import itertools
+
+# rank and suit order from low to high
+RANK_ORDER = "34567890JQKA2"
+SUIT_ORDER = "DCHS"
+
+# lookup tables between card strings and card values from 0 to 51
+NAMES = [rank + suit for rank, suit in itertools.product(RANK_ORDER, SUIT_ORDER)]
+VALUES = {name: value for value, name in enumerate(NAMES)}
+RANKS = [value // 4 for value in range(52)]
+SUITS = [value % 4 for value in range(52)]
+
+# single bit masks for every card, rank and suit
+BITS = [1 << value for value in range(52)]
+RANK_MASKS = [0b1111 << rank * 4 for rank in range(13)]
+SUIT_MASKS = [sum(BITS[suit::4]) for suit in range(4)]
+FULL_DECK = (1 << 52) - 1
+
+
+def to_mask(cards):
+    mask = 0
+    for card in cards:
+        mask |= BITS[VALUES[card]]
+    return mask
+
+
+def to_values(mask):
+    # values come out from low to high, the same order as sorting by value
+    values = []
+    while mask:
+        low = mask & -mask
+        values.append(low.bit_length() - 1)
+        mask ^= low
+    return values
+
+
+def to_cards(mask):
+    return [NAMES[value] for value in to_values(mask)]
+
+
+try:
+    count = int.bit_count
+except AttributeError:  # popcount for python before 3.10
+    def count(mask):
+        return bin(mask).count('1')
+
+
+def lowest(mask):
+    return (mask & -mask).bit_length() - 1
+
+
+def highest(mask):
+    return mask.bit_length() - 1
+
+
+class CardSet:
+    """
+    A set of cards stored as a 52-bit mask.
+
+    Iterating a card set yields card strings sorted by value, so it can stand in
+    for the sorted card lists used by ``play`` and be turned back into one with
+    ``list()``.
+    """
+
+    def __init__(self, cards=()):
+        self.mask = to_mask(cards)
+
+    @classmethod
+    def from_mask(cls, mask):
+        card_set = cls.__new__(cls)
+        card_set.mask = mask
+        return card_set
+
+    def __repr__(self):
+        return "CardSet({})".format(to_cards(self.mask))
+
+    def __len__(self):
+        return count(self.mask)
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __iter__(self):
+        return iter(to_cards(self.mask))
+
+    def __contains__(self, card):
+        return self.mask & BITS[VALUES[card]] != 0
+
+    def __eq__(self, other):
+        return isinstance(other, CardSet) and self.mask == other.mask
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __or__(self, other):
+        return CardSet.from_mask(self.mask | other.mask)
+
+    def __and__(self, other):
+        return CardSet.from_mask(self.mask & other.mask)
+
+    def __sub__(self, other):
+        return CardSet.from_mask(self.mask & ~other.mask)
+
+    def __invert__(self):
+        # cards of the full deck that are not in this set
+        return CardSet.from_mask(FULL_DECK & ~self.mask)
+
+    def copy(self):
+        return CardSet.from_mask(self.mask)
+
+    def add(self, card):
+        self.mask |= BITS[VALUES[card]]
+
+    def remove(self, card):
+        bit = BITS[VALUES[card]]
+        if not self.mask & bit:
+            raise KeyError(card)
+        self.mask ^= bit
+
+    def discard(self, card):
+        self.mask &= ~BITS[VALUES[card]]
+
+    def issubset(self, other):
+        return self.mask & ~other.mask == 0
+
+    def values(self):
+        return to_values(self.mask)
+
+    def lowest(self):
+        return NAMES[lowest(self.mask)] if self.mask else None
+
+    def highest(self):
+        return NAMES[highest(self.mask)] if self.mask else None
@@ -0,0 +1,178 @@
+"""
+Exact endgame search for rounds with few cards left.
+
+The search is paranoid: the other three players are taken to play together
+against us, so a position is won only if we go out first whatever they do,
+and a yes or no answer lets every branch stop at its first deciding move.
+Positions are stored in a transposition table under Zobrist keys, moves are
+tried strongest first with going out before anything else, and the search
+gives up after ``max_nodes`` positions, or also after ``time_limit`` seconds
+when given, at the cost of decisions that depend on the speed of the machine.
+Hidden hands are dealt at random a number of times and the move winning in
+the most deals is chosen.
+"""
+
+import random
+import time
+
+from bigtwo.cache import LRUCache
+from bigtwo.cards import count, to_cards, to_mask, to_values
+from bigtwo.engine import FULL_STAGE
+from bigtwo.knowledge import knowledge_of
+from bigtwo.moves import LENGTHS, Moves
+from bigtwo.pimc import player_to_beat
+from bigtwo.simulate import determinise
+from bigtwo.tricks import strength
+
+_zobrist = random.Random(0)
+# keys for each card in each hand, each card of the play to beat, and the players to move and to beat
+HAND_KEYS = [[_zobrist.getrandbits(64) for _ in range(52)] for _ in range(4)]
+BEAT_KEYS = [_zobrist.getrandbits(64) for _ in range(52)]
+TURN_KEYS = [_zobrist.getrandbits(64) for _ in range(4)]
+LAST_KEYS = [_zobrist.getrandbits(64) for _ in range(4)]
+
+
+class Unsolved(Exception):
+    pass
+
+
+class EndgameSolver:
+    """
+    Solve endgames under ``rules`` within ``max_nodes`` positions per
+    decision, and ``time_limit`` seconds when given, over ``samples`` deals of
+    the hidden cards, weighted by what passes tell when ``infer``.
+    """
+
+    moves_cache = LRUCache(maxsize=4096)
+
+    def __init__(self, rules=FULL_STAGE, max_nodes=8000, time_limit=None, samples=8, max_table=200000,
+                 infer=True):
+        self.rules = rules
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.deadline = None
+        self.samples = samples
+        self.max_table = max_table
+        self.infer = infer
+        # one table per player searched for, as positions are won or lost for them
+        self.tables = [{}, {}, {}, {}]
+        # the cards seen at each player's last decision, which only grow within a round
+        self.seen = [0, 0, 0, 0]
+        self.nodes = 0
+        self.solved = 0
+        self.unsolved = 0
+
+    def choose(self, hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes):
+        """
+        Return the play that wins in the most deals, or None when no play
+        wins in any deal or the search ran out of nodes or time.
+        """
+        hand_mask = to_mask(hand)
+        beat_mask = to_mask(play_to_beat)
+        knowledge = knowledge_of(round_history)
+        seen = knowledge.seen
+        deal = knowledge.beliefs.deal if self.infer else determinise
+        last_player = player_to_beat(round_history, player_no)
+        candidates = self.moves(hand_mask, beat_mask, is_start_of_round)
+
+        rng = random.Random("{}:{}:{}".format(hand_mask, seen, player_no))
+        wins = [0] * len(candidates)
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_limit if self.time_limit else None
+        table = self.tables[player_no]
+        # positions from an earlier deal never come up again
+        if self.seen[player_no] & ~seen or len(table) > self.max_table:
+            table.clear()
+        self.seen[player_no] = seen
+        try:
+            for _ in range(self.samples):
+                hands = deal(hand_mask, seen, player_no, hand_sizes, rng)
+                key = _key(hands, player_no, beat_mask, last_player)
+                for index, move in enumerate(candidates):
+                    if move == hand_mask or self._after(table, player_no, hands, player_no, beat_mask,
+                                                        last_player, key, move):
+                        wins[index] += 1
+        except Unsolved:
+            self.unsolved += 1
+            return None
+        self.solved += 1
+        best = max(range(len(candidates)), key=lambda index: wins[index])
+        return to_cards(candidates[best]) if wins[best] else None
+
+    def moves(self, hand, play_to_beat, is_start_of_round=False):
+        """
+        Return every legal move of a hand, going out first, then the
+        strongest plays, then a pass when following.
+        """
+        moves = self.moves_cache.get(hand)
+        if moves is None:
+            moves = Moves(hand)
+            self.moves_cache.put(hand, moves)
+        length = count(play_to_beat)
+        key = strength(play_to_beat) if play_to_beat else -1
+        plays = []
+        for kind in self.rules.kinds:
+            if not length or LENGTHS[kind] == length:
+                plays.extend((moves.keys[kind][index], play) for index, play in enumerate(moves.plays[kind])
+                             if moves.keys[kind][index] > key and (not is_start_of_round or play & 1))
+        plays.sort(reverse=True, key=lambda keyed: (keyed[1] == hand, LENGTHS[keyed[0] >> 8], keyed[0]))
+        ordered = [play for _, play in plays]
+        return ordered + [0] if play_to_beat else ordered
+
+    def _after(self, table, root, hands, player_no, play_to_beat, last_player, key, move):
+        # whether ``root`` wins after ``player_no`` makes a move that does not end the round
+        for value in to_values(move):
+            key ^= HAND_KEYS[player_no][value]
+        hands[player_no] ^= move
+        if move:
+            key ^= _beat_key(play_to_beat) ^ _beat_key(move) ^ LAST_KEYS[last_player] ^ LAST_KEYS[player_no]
+            play_to_beat = move
+            last_player = player_no
+        following = (player_no + 1) & 3
+        key ^= TURN_KEYS[player_no] ^ TURN_KEYS[following]
+        if following == last_player:
+            key ^= _beat_key(play_to_beat)
+            play_to_beat = 0
+        try:
+            return self._search(table, root, hands, following, play_to_beat, last_player, key)
+        finally:
+            hands[player_no] ^= move
+
+    def _search(self, table, root, hands, player_no, play_to_beat, last_player, key):
+        won = table.get(key)
+        if won is not None:
+            return won
+        self.nodes += 1
+        # the clock is only read every 256 positions, to keep the check cheap
+        if self.nodes > self.max_nodes or self.deadline and not self.nodes & 255 and \
+                time.perf_counter() > self.deadline:
+            raise Unsolved()
+
+        # we need one winning move, the others need one move that beats us
+        ours = player_no == root
+        won = not ours
+        hand = hands[player_no]
+        for move in self.moves(hand, play_to_beat):
+            if move == hand:
+                won = ours
+                break
+            if self._after(table, root, hands, player_no, play_to_beat, last_player, key, move) == ours:
+                won = ours
+                break
+        table[key] = won
+        return won
+
+
+def _beat_key(play_to_beat):
+    key = 0
+    for value in to_values(play_to_beat):
+        key ^= BEAT_KEYS[value]
+    return key
+
+
+def _key(hands, player_no, play_to_beat, last_player):
+    key = _beat_key(play_to_beat) ^ TURN_KEYS[player_no] ^ LAST_KEYS[last_player]
+    for hand_player, hand in enumerate(hands):
+        for value in to_values(hand):
+            key ^= HAND_KEYS[hand_player][value]
+    return key
@@ -0,0 +1,317 @@
+"""
+Headless big two match engine for all three competition stages.
+
+Players are ``play`` functions with the competition signature. Nothing is
+printed; pass a ``log`` callable to receive one event dictionary per deal,
+play, new trick and round end, or ``print_event`` for match.py style output.
+The round history given to players is a ``RoundHistory``, which also carries
+the ``Knowledge`` of the cards played so far.
+
+Every deal has a deal id, and a round is fully determined by its deal id,
+round number and scores, so it can be replayed on its own with ``--replay``.
+"""
+
+import argparse
+import collections
+import functools
+import importlib.util
+import os
+import random
+import sys
+
+from bigtwo.budget import TimeBudget
+from bigtwo.cards import NAMES, VALUES, to_mask
+from bigtwo.gamelog import GameLogWriter
+from bigtwo.knowledge import RoundHistory
+from bigtwo.monitor import DecisionMonitor, save_report
+from bigtwo.tricks import SINGLE, PAIR, TRIPLE, INVALID, TYPE_NAMES, classify, strength_key
+
+RoundResult = collections.namedtuple("RoundResult", "winner hand_sizes history turns deal_id")
+MatchResult = collections.namedtuple("MatchResult", "win_count rounds")
+
+
+class IllegalPlay(ValueError):
+
+    def __init__(self, player_no, play, reason):
+        super().__init__("player {} played {}: {}".format(player_no, play, reason))
+        self.player_no = player_no
+        self.play = play
+        self.reason = reason
+
+
+class Rules:
+    """
+    The trick types allowed in one stage of the competition.
+    """
+
+    def __init__(self, name, kinds):
+        self.name = name
+        self.kinds = frozenset(kinds)
+
+    def __repr__(self):
+        return "Rules({!r})".format(self.name)
+
+    def check(self, play, hand, play_to_beat, is_start_of_round):
+        """
+        Return why a play is not allowed, or None if it is.
+        """
+        if not play:
+            return "cannot pass at the start of a trick" if not play_to_beat else None
+        mask = to_mask(play)
+        if len(play) != len(set(play)) or mask & ~to_mask(hand):
+            return "cards are not all in hand"
+        kind, deciding = classify(mask)
+        if kind == INVALID or kind not in self.kinds:
+            return "not a {} stage trick".format(self.name)
+        if is_start_of_round and "3D" not in play:
+            return "first play of the round must contain 3D"
+        if play_to_beat:
+            other_kind, other_deciding = classify(to_mask(play_to_beat))
+            if len(play) != len(play_to_beat):
+                return "does not match the length of {}".format(play_to_beat)
+            if strength_key(kind, deciding) <= strength_key(other_kind, other_deciding):
+                return "{} does not beat {}".format(TYPE_NAMES[kind], play_to_beat)
+        return None
+
+
+SINGLE_STAGE = Rules("single", [SINGLE])
+TRIPLE_STAGE = Rules("triple", [SINGLE, PAIR, TRIPLE])
+FULL_STAGE = Rules("full", range(8))
+STAGES = {rules.name: rules for rules in (SINGLE_STAGE, TRIPLE_STAGE, FULL_STAGE)}
+
+
+def deal_hands(rng=random):
+    deck = list(NAMES)
+    rng.shuffle(deck)
+    return [deck[player_no * 13:(player_no + 1) * 13] for player_no in range(4)]
+
+
+def round_rng(seed, round_no):
+    # string seeds are hashed with sha512, so they derive the same stream in every process
+    return random.Random("{}:{}".format(seed, round_no))
+
+
+def deal_id(deal):
+    """
+    Encode a deal as 26 hex digits, two bits per card for the seat holding it.
+    """
+    seats = 0
+    for player_no, hand in enumerate(deal):
+        for card in hand:
+            seats |= player_no << 2 * VALUES[card]
+    return "{:026x}".format(seats)
+
+
+def deal_from_id(deal_id):
+    seats = int(deal_id, 16)
+    return [[card for card in NAMES if (seats >> 2 * VALUES[card]) & 3 == player_no] for player_no in range(4)]
+
+
+def play_round(players, rules=FULL_STAGE, deal=None, rng=random, round_no=0, scores=(0, 0, 0, 0), log=None,
+               strict=True, monitor=None):
+    """
+    Play one round between four player functions and return a ``RoundResult``.
+
+    ``deal`` is a list of four hands of card strings, dealt from ``rng`` when
+    not given. Plays that break the rules raise ``IllegalPlay`` when
+    ``strict``, otherwise they are counted as passes, or as the lowest card at
+    the start of a trick. A ``DecisionMonitor`` times every call to the
+    players when given.
+    """
+    if monitor:
+        players = monitor.wrap(players)
+    if deal is None:
+        deal = deal_hands(rng)
+    hands = [sorted(hand, key=VALUES.__getitem__) for hand in deal]
+    hand_sizes = [len(hand) for hand in hands]
+    player_no = next(no for no in range(4) if "3D" in hands[no])
+    this_deal = deal_id(hands)
+    if log:
+        log({"event": "deal", "round_no": round_no, "hands": [list(hand) for hand in hands], "deal_id": this_deal,
+             "scores": list(scores)})
+
+    history = RoundHistory([[]])
+    play_to_beat = []
+    last_player = player_no
+    is_start_of_round = True
+    turns = 0
+    while True:
+        hand = hands[player_no]
+        play = players[player_no](list(hand), is_start_of_round, play_to_beat, history, player_no,
+                                  list(hand_sizes), list(scores), round_no)
+        play = list(play) if play else []
+        turns += 1
+
+        reason = rules.check(play, hand, play_to_beat, is_start_of_round)
+        if reason:
+            if strict:
+                raise IllegalPlay(player_no, play, reason)
+            play = [] if play_to_beat else ["3D" if is_start_of_round else hand[0]]
+
+        history.knowledge.record(player_no, play, play_to_beat)
+        if play:
+            for card in play:
+                hand.remove(card)
+            hand_sizes[player_no] -= len(play)
+            last_player = player_no
+            play_to_beat = play
+        history[-1].append([player_no, play])
+        if log:
+            log({"event": "play", "round_no": round_no, "player_no": player_no, "play": play,
+                 "hand": list(hand), "illegal": reason})
+        if not hand:
+            break
+
+        is_start_of_round = False
+        player_no = (player_no + 1) % 4
+        if player_no == last_player:
+            play_to_beat = []
+            history.append([])
+            if log:
+                log({"event": "trick", "round_no": round_no, "player_no": player_no})
+
+    if log:
+        log({"event": "round", "round_no": round_no, "winner": player_no, "hand_sizes": list(hand_sizes)})
+    if monitor:
+        monitor.end_round()
+    return RoundResult(player_no, hand_sizes, history, turns, this_deal)
+
+
+def play_match(players, rules=FULL_STAGE, rounds=10, seed=None, log=None, strict=True, keep_rounds=False,
+               monitor=None):
+    """
+    Play a number of rounds and return a ``MatchResult``.
+
+    As in match.py, the winner of a round scores one point. Unlike match.py,
+    which always passes ``[0, 0, 0, 0]``, the points so far are passed to the
+    players as ``scores``, as the competition describes them. Each round is
+    dealt from ``round_rng(seed, round_no)``, with a random seed when none is
+    given.
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    win_count = [0, 0, 0, 0]
+    results = []
+    for round_no in range(rounds):
+        result = play_round(players, rules, rng=round_rng(seed, round_no), round_no=round_no,
+                            scores=tuple(win_count), log=log, strict=strict, monitor=monitor)
+        win_count[result.winner] += 1
+        if keep_rounds:
+            results.append(result)
+    return MatchResult(win_count, results)
+
+
+def load_bot(path):
+    """
+    Import a bot script by file path, with its own directory importable as
+    match.py expects, under a module name unique to the path.
+    """
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    name = "bot_" + os.path.relpath(path)[:-len(".py")].replace(os.sep, "_").replace(".", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_player(spec):
+    """
+    Return the play function of a bot given as ``path`` or ``path:test_val``,
+    where a test value is passed as an extra last argument as in match.py, or
+    as ``path:name=value,...`` to pass keyword arguments.
+    """
+    path, _, options = spec.partition(':')
+    play = load_bot(path).play
+    if '=' in options:
+        return functools.partial(play, **{name: parse_number(value) for name, value in
+                                          (option.split('=') for option in options.split(','))})
+    if options:
+        return functools.partial(_with_test_val, play, parse_number(options))
+    return play
+
+
+def parse_number(text):
+    return float(text) if '.' in text else int(text)
+
+
+def _with_test_val(play, test_val, *args):
+    return play(*args, test_val)
+
+
+def _fan_out(loggers):
+    if len(loggers) < 2:
+        return loggers[0] if loggers else None
+    return lambda event: [log(event) for log in loggers]
+
+
+def print_event(event):
+    if event["event"] == "deal":
+        print("\n\n===== Round {} =====\n".format(event["round_no"]))
+        print("Deal {} scores {}".format(event["deal_id"], ','.join(map(str, event["scores"]))))
+        for player_no, hand in enumerate(event["hands"]):
+            print("Player {} hand: {}".format(player_no, ' '.join(hand)))
+    elif event["event"] == "trick":
+        print("--- start of new trick ---")
+    elif event["event"] == "play":
+        print("Player {} played {} have {} in hand".format(event["player_no"], event["play"], ' '.join(event["hand"])))
+    elif event["event"] == "round":
+        print("Player {} won!".format(event["winner"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a match between four bots.")
+    parser.add_argument("stage", choices=sorted(STAGES))
+    parser.add_argument("players", nargs=4, help="bot script paths, optionally followed by :test_val")
+    parser.add_argument("-n", "--rounds", type=int, default=100)
+    parser.add_argument("-s", "--seed", default=None, help="seed the deals of the match")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every deal and play")
+    parser.add_argument("--replay", metavar="DEAL_ID", help="replay a single round from its deal id")
+    parser.add_argument("--round-no", type=int, default=0, help="round number of the replayed round")
+    parser.add_argument("--scores", default="0,0,0,0", help="scores before the replayed round")
+    parser.add_argument("--log", metavar="PATH", help="append every round to a binary game log")
+    parser.add_argument("--compress", action="store_true", help="gzip the game log")
+    parser.add_argument("--monitor", metavar="PATH", help="time every decision and write a JSON report")
+    parser.add_argument("--monitor-every", type=int, default=None, metavar="ROUNDS",
+                        help="also rewrite the report every so many rounds")
+    parser.add_argument("--budget", type=float, default=None, metavar="SECONDS",
+                        help="answer with a cheap play when a bot takes longer than this")
+    args = parser.parse_args(argv)
+
+    players = [load_player(spec) for spec in args.players]
+    if args.budget:
+        players = [TimeBudget(play, args.budget) for play in players]
+    if args.replay:
+        scores = tuple(int(score) for score in args.scores.split(','))
+        play_round(players, STAGES[args.stage], deal_from_id(args.replay), round_no=args.round_no, scores=scores,
+                   log=print_event)
+        return
+    loggers = [print_event] if args.verbose else []
+    if args.log:
+        loggers.append(GameLogWriter(args.log, args.compress))
+    monitor = None
+    if args.monitor:
+        monitor = DecisionMonitor(args.players, every=args.monitor_every or args.rounds,
+                                  stream=functools.partial(save_report, path=args.monitor))
+    result = play_match(players, STAGES[args.stage], args.rounds, args.seed, log=_fan_out(loggers), monitor=monitor)
+    if args.log:
+        loggers[-1].close()
+    if monitor:
+        monitor.save(args.monitor)
+    for player_no, wins in enumerate(result.win_count):
+        print("Player {} ({}) won {} rounds, winning rate {:.3f}".format(
+            player_no, args.players[player_no], wins, wins / args.rounds))
+    if args.budget:
+        for player_no, play in enumerate(players):
+            print("Player {} timed out on {timeouts} of {calls} calls and raised on {errors}".format(
+                player_no, **play.stats()))
+            play.close()
+
+
+if __name__ == '__main__':
+    main()
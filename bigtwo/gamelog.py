@@ -0,0 +1,288 @@
+"""
+Compact append-only binary log of played rounds.
+
+A log starts with ``MAGIC`` and a version byte, followed by one frame per
+round: a little endian header of payload length, round number, the four
+scores and the 13 byte deal id, then one record per play made of a byte
+holding the player number and the number of cards, and one byte per card
+value. A pass is a record with no cards. From version 2 a frame ends with its
+payload length again, so a log can be checked from its end.
+
+``GameLogWriter`` is a ``log`` callable for the match engine. Logs can be
+gzip compressed as a whole, and ``read_rounds`` streams them back one round at
+a time, memory mapping uncompressed logs instead of reading them in. A frame
+cut short by an interrupted writer ends the log for the reader, and is cut
+off before a writer appends to the log again, in the version the log has.
+"""
+
+import argparse
+import collections
+import gzip
+import mmap
+import os
+import struct
+import zlib
+
+from bigtwo.cards import NAMES, VALUES
+
+MAGIC = b"B2LOG"
+VERSION = 2
+HEADER = len(MAGIC) + 1
+GZIP_MAGIC = b"\x1f\x8b"
+# window bits that make zlib read and write gzip members
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+# payload length, round number, four scores and the deal id
+FRAME = struct.Struct("<II4I13s")
+# the payload length again, after the payload from version 2
+TRAILER = struct.Struct("<I")
+
+LoggedRound = collections.namedtuple("LoggedRound", "round_no scores deal_id plays winner")
+
+
+class GameLogWriter:
+    """
+    Append the rounds reported by the engine's log events to a file.
+    """
+
+    def __init__(self, path, compress=False):
+        self.version = _repair(path, compress)
+        self.file = gzip.open(path, "ab") if compress else open(path, "ab")
+        if self.version is None:
+            self.version = VERSION
+            self.file.write(MAGIC + bytes([VERSION]))
+        self.header = None
+        self.plays = bytearray()
+        self.rounds = 0
+
+    def __call__(self, event):
+        if event["event"] == "deal":
+            self.header = (event["round_no"], event["scores"], bytes.fromhex(event["deal_id"]))
+            self.plays.clear()
+        elif event["event"] == "play":
+            play = event["play"]
+            self.plays.append(event["player_no"] | len(play) << 2)
+            self.plays.extend(VALUES[card] for card in play)
+        elif event["event"] == "round":
+            round_no, scores, deal = self.header
+            self.file.write(FRAME.pack(len(self.plays), round_no, *scores, deal))
+            self.file.write(self.plays)
+            if self.version > 1:
+                self.file.write(TRAILER.pack(len(self.plays)))
+            self.rounds += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_rounds(path):
+    """
+    Yield a ``LoggedRound`` for every round in a log, with plays as lists of
+    ``[player_no, play]`` like the tricks of a round history.
+    """
+    with open(path, "rb") as file:
+        if file.read(2) == GZIP_MAGIC:
+            file.seek(0)
+            yield from _read_stream(_gunzip(file))
+            return
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            trailer = _trailer_size(_check_magic(data[:HEADER]))
+            offset = HEADER
+            # a frame cut short by an interrupted writer ends the log
+            while offset + FRAME.size <= len(data):
+                length, round_no, *scores, deal = FRAME.unpack_from(data, offset)
+                offset += FRAME.size
+                if offset + length + trailer > len(data):
+                    return
+                yield _parse_round(round_no, scores, deal, data[offset:offset + length])
+                offset += length + trailer
+
+
+def _read_stream(chunks):
+    buffer = bytearray()
+    trailer = None
+    for chunk in chunks:
+        buffer += chunk
+        if trailer is None:
+            if len(buffer) < HEADER:
+                continue
+            trailer = _trailer_size(_check_magic(buffer[:HEADER]))
+            del buffer[:HEADER]
+        while len(buffer) >= FRAME.size:
+            length, round_no, *scores, deal = FRAME.unpack_from(buffer)
+            if len(buffer) < FRAME.size + length + trailer:
+                break
+            yield _parse_round(round_no, scores, deal, bytes(buffer[FRAME.size:FRAME.size + length]))
+            del buffer[:FRAME.size + length + trailer]
+    if trailer is None:
+        _check_magic(buffer)
+
+
+def _gunzip(file):
+    """
+    Yield the decompressed chunks of every gzip member, stopping quietly where
+    an interrupted writer cut the stream, and return whether it did.
+    """
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    started = False
+    while True:
+        raw = file.read(1 << 16)
+        if not raw:
+            return started
+        started = True
+        while raw:
+            yield decompressor.decompress(raw)
+            raw = b""
+            if decompressor.eof:
+                raw = decompressor.unused_data
+                decompressor = zlib.decompressobj(GZIP_WBITS)
+                started = bool(raw)
+
+
+def _read_chunks(file):
+    while True:
+        chunk = file.read(1 << 16)
+        if not chunk:
+            return False
+        yield chunk
+
+
+def _repair(path, compress):
+    """
+    Cut an existing log back to its last complete frame before appending, and
+    return its version, or None when not even its header is complete.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as file:
+        compressed = file.read(2) == GZIP_MAGIC
+        if compressed != compress:
+            raise ValueError("{} is {}a gzip compressed game log".format(path, "" if compressed else "not "))
+        file.seek(0)
+        if not compressed:
+            version = _intact_version(file, os.fstat(file.fileno()).st_size)
+            if version is not None:
+                return version
+            file.seek(0)
+        # the log is read a chunk at a time, as it can be far larger than memory
+        version, end, cut = _scan(_gunzip(file) if compressed else _read_chunks(file))
+    if not cut:
+        return version
+    if compressed:
+        # a gzip stream cannot be cut in place, so the complete frames are copied to a new one
+        with open(path, "rb") as file, gzip.open(path + ".part", "wb") as stream:
+            for chunk in _gunzip(file):
+                stream.write(chunk[:end])
+                end -= min(end, len(chunk))
+                if not end:
+                    break
+        os.replace(path + ".part", path)
+    else:
+        with open(path, "r+b") as file:
+            file.truncate(end)
+    return version
+
+
+def _intact_version(file, size):
+    # the version of an uncompressed log whose last frame is complete, from the length it repeats at its end
+    header = file.read(HEADER)
+    if len(header) < HEADER:
+        return None
+    version = _check_magic(header)
+    if size == HEADER:
+        return version
+    if version < 2 or size < HEADER + FRAME.size + TRAILER.size:
+        return None
+    file.seek(size - TRAILER.size)
+    length, = TRAILER.unpack(file.read(TRAILER.size))
+    start = size - TRAILER.size - length - FRAME.size
+    if start < HEADER:
+        return None
+    file.seek(start)
+    return version if FRAME.unpack(file.read(FRAME.size))[0] == length else None
+
+
+def _scan(chunks):
+    """
+    Return the version of a log stream, the length of the stream up to its last
+    complete frame, and whether the stream goes on past that or was cut.
+    """
+    buffer = bytearray()
+    version = None
+    end = 0
+    while True:
+        try:
+            buffer += next(chunks)
+        except StopIteration as stop:
+            cut = stop.value
+            break
+        if version is None:
+            if len(buffer) < HEADER:
+                continue
+            version = _check_magic(buffer[:HEADER])
+            trailer = _trailer_size(version)
+            del buffer[:HEADER]
+            end = HEADER
+        while len(buffer) >= FRAME.size:
+            size = FRAME.size + FRAME.unpack_from(buffer)[0] + trailer
+            if len(buffer) < size:
+                break
+            del buffer[:size]
+            end += size
+    if version is None and not (MAGIC + bytes([VERSION])).startswith(bytes(buffer)):
+        _check_magic(buffer)
+    return version, end, cut or bool(buffer)
+
+
+def _check_magic(header):
+    # the version of a log from its header
+    if len(header) < HEADER or header[:len(MAGIC)] != MAGIC or not 1 <= header[len(MAGIC)] <= VERSION:
+        raise ValueError("not a game log of version {} or earlier".format(VERSION))
+    return header[len(MAGIC)]
+
+
+def _trailer_size(version):
+    return TRAILER.size if version > 1 else 0
+
+
+def _parse_round(round_no, scores, deal, payload):
+    plays = []
+    winner = None
+    index = 0
+    while index < len(payload):
+        player_no = payload[index] & 3
+        size = payload[index] >> 2
+        plays.append([player_no, [NAMES[value] for value in payload[index + 1:index + 1 + size]]])
+        if size:
+            winner = player_no
+        index += 1 + size
+    return LoggedRound(round_no, scores, deal.hex(), plays, winner)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise a binary game log.")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    rounds = 0
+    plays = 0
+    win_count = [0, 0, 0, 0]
+    for logged in read_rounds(args.path):
+        rounds += 1
+        plays += len(logged.plays)
+        win_count[logged.winner] += 1
+    print("{} rounds, {} plays".format(rounds, plays))
+    for player_no, wins in enumerate(win_count):
+        print("Player {} won {} rounds".format(player_no, wins))
+
+
+if __name__ == '__main__':
+    main()
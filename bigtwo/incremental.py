@@ -0,0 +1,59 @@
+"""
+Hand organisation that carries over between the turns of a round.
+"""
+
+from bigtwo.cards import RANK_MASKS, RANKS, to_values
+
+
+def same_cards(removed):
+    return removed
+
+
+def same_ranks(removed):
+    # every card sharing a rank with a removed card
+    mask = 0
+    for value in to_values(removed):
+        mask |= RANK_MASKS[RANKS[value]]
+    return mask
+
+
+class IncrementalOrganiser:
+    """
+    Keep each player's decomposition of their hand for the rest of a round.
+
+    ``build`` splits a card mask into a list of trick masks. When a player's
+    hand has only lost cards since their last call in the same round, tricks
+    clear of the cards picked by ``affected(removed)`` are kept and only the
+    cards left over from the other tricks are passed to ``build``. Any other
+    change to the hand falls back to building the whole hand again.
+    """
+
+    def __init__(self, build, affected=same_cards):
+        self.build = build
+        self.affected = affected
+        self.states = {}
+        self.repairs = 0
+        self.rebuilds = 0
+
+    def organise(self, mask, player_no, round_no):
+        state = self.states.get(player_no)
+        if state is not None and state[0] == round_no and mask & ~state[1] == 0:
+            affected = self.affected(state[1] & ~mask)
+            tricks = [trick for trick in state[2] if not trick & affected]
+            loose = mask
+            for trick in tricks:
+                loose &= ~trick
+            if loose:
+                tricks += self.build(loose)
+            self.repairs += 1
+        else:
+            tricks = self.build(mask)
+            self.rebuilds += 1
+        self.states[player_no] = round_no, mask, tricks
+        return list(tricks)
+
+    def forget(self, player_no=None):
+        if player_no is None:
+            self.states.clear()
+        else:
+            self.states.pop(player_no, None)
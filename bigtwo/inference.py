@@ -0,0 +1,179 @@
+"""
+Inference of the other players' hands from the passes made in a round.
+
+A player who passes on a trick usually holds nothing that beats it, so a
+hand that could have beaten a pass is ``pass_weight`` times less likely than
+one that could not, and a weight of 0 excludes it outright. The hand at the
+time of a pass also holds every card the player has played since, and once
+those cards alone beat the trick the pass is known to be tactical and tells
+nothing more. A player holding back a strong trick passes again and again,
+so only the weakest open pass of each trick length counts for each player.
+
+For a pass on a single card this makes the other player's hand a mixture
+of a plain deal and a deal of only the cards under the pass, weighted by
+the chance of such a hand, so the sampler draws it with shuffles alone.
+Deals are then accepted with the likelihood of the passes on longer tricks,
+settling for the last of a few tries. With a weight of 0 the sampler never
+settles: it keeps drawing, and raises ValueError when the passes cannot be
+met or no deal of many fits them. Without any evidence the sampler is a
+plain shuffle.
+"""
+
+import math
+import random
+
+from bigtwo.cards import FULL_DECK, NAMES, RANK_MASKS, count, highest, to_values
+from bigtwo.moves import strongest
+from bigtwo.simulate import determinise
+from bigtwo.tricks import STRAIGHT_FLUSH, strength
+
+# how often the bots here pass while holding a play that beats the trick
+PASS_WEIGHT = 0.25
+
+
+class Beliefs:
+    """
+    The evidence about each player's hand from their plays and passes.
+    """
+
+    def __init__(self, pass_weight=PASS_WEIGHT, tries=4, exact_tries=1000):
+        self.pass_weight = pass_weight
+        self.tries = tries
+        # the deals drawn before giving up when a weight of 0 excludes hands outright
+        self.exact_tries = exact_tries
+        self.played = [0, 0, 0, 0]
+        # per player, the deciding cards of passes on single cards not explained by a later play
+        self.single_passes = [[], [], [], []]
+        # per player, passes on longer tricks not explained, with the cards played before them
+        self.passes = [[], [], [], []]
+
+    def record(self, player_no, play, play_to_beat):
+        """
+        Add a play mask, or a pass on the ``play_to_beat`` mask when ``play`` is 0.
+        """
+        if play:
+            played = self.played[player_no] = self.played[player_no] | play
+            top = highest(play)
+            self.single_passes[player_no] = [deciding for deciding in self.single_passes[player_no]
+                                             if deciding > top]
+            self.passes[player_no] = [(beaten, before) for beaten, before in self.passes[player_no]
+                                      if not _beats(played & ~before, beaten)]
+        elif play_to_beat:
+            if count(play_to_beat) == 1:
+                self.single_passes[player_no].append(highest(play_to_beat))
+            else:
+                self.passes[player_no].append((play_to_beat, self.played[player_no]))
+
+    def ceiling(self, player_no):
+        """
+        Return the card a player is taken to hold nothing above, from their
+        weakest open pass on a single card, or None.
+        """
+        return min(self.single_passes[player_no], default=None)
+
+    def weakest_passes(self, player_no):
+        """
+        Return the weakest open pass of a player on each longer trick length,
+        with the cards they had played before it.
+        """
+        weakest = {}
+        for beaten, before in self.passes[player_no]:
+            length = count(beaten)
+            if length not in weakest or strength(beaten) < strength(weakest[length][0]):
+                weakest[length] = beaten, before
+        return list(weakest.values())
+
+    def holding(self, hand, seen, player_no, hand_sizes, samples=200, rng=random):
+        """
+        Return for each player the estimated chance of holding each card,
+        with ``hand`` held by ``player_no`` and ``seen`` played, over sampled deals.
+        """
+        chances = [[0.0] * 52 for _ in range(4)]
+        for _ in range(samples):
+            for other, other_hand in enumerate(self.deal(hand, seen, player_no, hand_sizes, rng)):
+                for value in to_values(other_hand):
+                    chances[other][value] += 1 / samples
+        return chances
+
+    def accepts(self, hands, passes, rng=random):
+        """
+        Accept a deal with its likelihood under ``passes``, a player number
+        to pass list from ``weakest_passes``, drawn one pass at a time so most
+        rejections stop early.
+        """
+        for player_no, player_passes in passes.items():
+            for beaten, before in player_passes:
+                if _beats(hands[player_no] | self.played[player_no] & ~before, beaten) and \
+                        rng.random() >= self.pass_weight:
+                    return False
+        return True
+
+    def deal(self, hand, seen, player_no, hand_sizes, rng=random):
+        """
+        Deal the cards nobody has seen to the other players in the numbers
+        given by ``hand_sizes`` and return the four hand masks, as
+        ``bigtwo.simulate.determinise`` does but weighted by the evidence.
+        Raises ValueError when a weight of 0 leaves no deal to draw.
+        """
+        others = [other for other in range(4) if other != player_no and hand_sizes[other]]
+        if not any(self.single_passes[other] or self.passes[other] for other in others):
+            return determinise(hand, seen, player_no, hand_sizes, rng)
+        unseen = to_values(FULL_DECK & ~seen & ~hand)
+        ceilings = sorted((self.ceiling(other), other) for other in others if self.single_passes[other])
+        passes = {other: self.weakest_passes(other) for other in others if self.passes[other]}
+
+        tries = self.tries if self.pass_weight else self.exact_tries
+        for _ in range(tries):
+            hands = [0, 0, 0, 0]
+            hands[player_no] = hand
+            left = unseen
+            # the lowest ceiling goes first, so the cards under each ceiling are still a plain pool
+            for ceiling, other in ceilings:
+                below = [value for value in left if value <= ceiling]
+                if rng.random() < self._under(len(below), len(left), hand_sizes[other]):
+                    for value in rng.sample(below, hand_sizes[other]):
+                        hands[other] |= 1 << value
+                    left = [value for value in left if not hands[other] >> value & 1]
+                elif not self.pass_weight:
+                    raise ValueError("too few cards under the pass on {} for player {}".format(NAMES[ceiling], other))
+            left = list(left)
+            rng.shuffle(left)
+            dealt = 0
+            for other in others:
+                if not hands[other]:
+                    for value in left[dealt:dealt + hand_sizes[other]]:
+                        hands[other] |= 1 << value
+                    dealt += hand_sizes[other]
+            if self.accepts(hands, passes, rng):
+                return hands
+        if not self.pass_weight:
+            raise ValueError("none of {} deals drawn fits the passes".format(tries))
+        return hands
+
+    def _under(self, below, left, size):
+        # the chance that a hand of ``size`` cards from ``left`` comes from the ``below`` cards under a pass
+        if below < size:
+            return 0.0
+        under = math.comb(below, size) / math.comb(left, size)
+        return (1 - self.pass_weight) * under / (self.pass_weight + (1 - self.pass_weight) * under)
+
+
+def _beats(cards, play_to_beat):
+    # whether some trick within the cards beats a play of the same length
+    size = count(play_to_beat)
+    if size < 5:
+        # pairs and triples only need a rank with enough cards, above the deciding card on its own rank
+        deciding = highest(play_to_beat)
+        rank = deciding >> 2
+        same = cards & RANK_MASKS[rank]
+        if count(same) >= size and highest(same) > deciding:
+            return True
+        return any(count(cards & RANK_MASKS[higher]) >= size for higher in range(rank + 1, 13))
+    if count(cards) < 5:
+        return False
+    # any trick of a higher type wins, and these are tried from the cheapest to find
+    key = strength(play_to_beat)
+    if any(strongest(kind, cards) for kind in range((key >> 8) + 1, STRAIGHT_FLUSH + 1)):
+        return True
+    play = strongest(key >> 8, cards)
+    return bool(play) and strength(play) > key
@@ -0,0 +1,217 @@
+"""
+Information set Monte Carlo tree search for all three stages.
+
+The tree is searched from one player's point of view. Every iteration deals
+the unseen cards to the other players at random, walks down the tree through
+the moves legal in that deal, picked by UCB1 with availability counts, adds
+one new node and plays the round out with the rollout policy of
+``bigtwo.simulate``.
+
+A ``ISMCTS`` keeps each player's tree between their turns in a round: the
+plays made since the last search are followed down from the old root, so
+the statistics below the new root carry over. Trees are capped by node count.
+"""
+
+import bisect
+import math
+import random
+
+from bigtwo.cache import LRUCache
+from bigtwo.cards import RANK_MASKS, count, to_cards, to_mask, to_values
+from bigtwo.engine import FULL_STAGE
+from bigtwo.knowledge import knowledge_of
+from bigtwo.moves import LENGTHS, TYPES_OF_LENGTH, Moves
+from bigtwo.simulate import determinise, simulate
+from bigtwo.tricks import SINGLE, PAIR, TRIPLE, strength
+
+FIVE_CARD_KINDS = frozenset(TYPES_OF_LENGTH[5])
+
+
+class Node:
+    # ``player`` made the move leading here, and ``wins`` are counted for them
+    __slots__ = ("player", "children", "visits", "wins", "available")
+
+    def __init__(self, player):
+        self.player = player
+        self.children = {}
+        self.visits = 0
+        self.wins = 0
+        self.available = 0
+
+    def size(self):
+        nodes = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            nodes += 1
+            stack.extend(node.children.values())
+        return nodes
+
+
+class ISMCTS:
+    """
+    Choose plays under ``rules`` with ``iterations`` tree walks per decision,
+    keeping at most ``max_nodes`` nodes in each player's tree, with the deals
+    weighted by what passes tell when ``infer``.
+    """
+
+    # five-card plays come from move generation, which is worth keeping for repeated hands
+    moves_cache = LRUCache(maxsize=4096)
+
+    def __init__(self, rules=FULL_STAGE, iterations=2000, max_nodes=100000, exploration=0.7, per_kind=4, infer=True):
+        self.rules = rules
+        self.iterations = iterations
+        self.max_nodes = max_nodes
+        self.exploration = exploration
+        self.per_kind = per_kind
+        self.infer = infer
+        self.largest = max(LENGTHS[kind] for kind in rules.kinds if LENGTHS[kind] <= 3)
+        # player number to the hand they were dealt, their tree root, node count and the plays made before it
+        self.trees = {}
+        self.reused = 0
+
+    def choose(self, hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes):
+        hand_mask = to_mask(hand)
+        knowledge = knowledge_of(round_history)
+        seen = knowledge.seen
+        deal = knowledge.beliefs.deal if self.infer else determinise
+        plays = [(trick_player, to_mask(play)) for trick in round_history for trick_player, play in trick]
+        # the hand we were dealt tells the rounds apart, as a round number repeats from match to match
+        dealt = hand_mask | knowledge.played[player_no]
+        root, nodes = self._reroot(player_no, dealt, plays)
+
+        # the state just before our move, as simulate sees it
+        beat_mask = to_mask(play_to_beat)
+        last_player = next((trick_player for trick_player, play in reversed(plays) if play), player_no) \
+            if beat_mask else player_no
+        rng = random.Random("{}:{}:{}".format(hand_mask, seen, player_no))
+        for _ in range(self.iterations):
+            hands = deal(hand_mask, seen, player_no, hand_sizes, rng)
+            nodes += self._iterate(root, hands, (player_no - 1) & 3, beat_mask, last_player, is_start_of_round,
+                                   nodes < self.max_nodes, rng)
+
+        legal = self.legal_moves(hand_mask, beat_mask, is_start_of_round)
+        best = max(legal, key=lambda move: root.children[move].visits if move in root.children else -1)
+        self.trees[player_no] = (dealt, root, nodes, plays)
+        return to_cards(best)
+
+    def _reroot(self, player_no, dealt, plays):
+        # follow the plays made since the last search down the old tree, which is dropped once a new round starts
+        if player_no in self.trees:
+            tree_dealt, root, nodes, before = self.trees.pop(player_no)
+            if tree_dealt == dealt and len(plays) > len(before) and plays[:len(before)] == before:
+                for trick_player, play in plays[len(before):]:
+                    root = root.children.get(play)
+                    if root is None:
+                        break
+                else:
+                    self.reused += 1
+                    return root, root.size()
+        return Node((player_no - 1) & 3), 1
+
+    def _iterate(self, root, hands, mover, play_to_beat, last_player, is_start_of_round, expand, rng):
+        node = root
+        path = []
+        winner = None
+        added = 0
+        while winner is None:
+            player_no = (mover + 1) & 3
+            if player_no == last_player:
+                play_to_beat = 0
+            moves = self.legal_moves(hands[player_no], play_to_beat, is_start_of_round)
+            is_start_of_round = False
+
+            tried = []
+            untried = []
+            for move in moves:
+                child = node.children.get(move)
+                if child is None:
+                    untried.append(move)
+                else:
+                    child.available += 1
+                    tried.append((move, child))
+            if untried and expand:
+                move = rng.choice(untried)
+                child = node.children[move] = Node(player_no)
+                child.available = 1
+                added = 1
+            elif tried:
+                move, child = max(tried, key=self._ucb)
+            else:
+                break
+            path.append(child)
+
+            mover = player_no
+            if move:
+                hands[player_no] ^= move
+                if not hands[player_no]:
+                    winner = player_no
+                play_to_beat = move
+                last_player = player_no
+            node = child
+            if added:
+                break
+
+        if winner is None:
+            winner = simulate(hands, mover, play_to_beat, last_player, self.largest)
+        for child in path:
+            child.visits += 1
+            if child.player == winner:
+                child.wins += 1
+        return added
+
+    def _ucb(self, tried):
+        child = tried[1]
+        return child.wins / child.visits + self.exploration * math.sqrt(math.log(child.available) / child.visits)
+
+    def legal_moves(self, hand, play_to_beat, is_start_of_round):
+        """
+        Return the moves searched for a hand: the weakest few and the
+        strongest play of each trick type the stage allows, those holding
+        the 3D at the start of a round, and a pass when following.
+        """
+        moves = []
+        for plays in self._plays(hand, play_to_beat):
+            if is_start_of_round:
+                plays = [play for play in plays if play & 1]
+            moves.extend(plays[:self.per_kind] + plays[self.per_kind:][-1:])
+        if play_to_beat:
+            moves.append(0)
+        return moves
+
+    def _plays(self, hand, play_to_beat):
+        # the plays of each allowed kind that beat ``play_to_beat``, weakest first
+        length = count(play_to_beat)
+        if length <= 3:
+            # singles, pairs and triples of one length only compare by their highest card
+            deciding = play_to_beat.bit_length() - 1
+            ranks = [to_values(hand & rank_mask) for rank_mask in RANK_MASKS]
+            for kind in (SINGLE, PAIR, TRIPLE):
+                if kind in self.rules.kinds and length in (0, kind + 1):
+                    yield [play for play in _rank_groups(ranks, kind + 1) if play.bit_length() - 1 > deciding]
+        if length in (0, 5) and self.rules.kinds & FIVE_CARD_KINDS:
+            moves = self.moves_cache.get(hand)
+            if moves is None:
+                moves = Moves(hand)
+                self.moves_cache.put(hand, moves)
+            key = strength(play_to_beat) if play_to_beat else -1
+            for kind in sorted(self.rules.kinds & FIVE_CARD_KINDS):
+                yield moves.plays[kind][bisect.bisect_right(moves.keys[kind], key):]
+
+    def forget(self, player_no=None):
+        if player_no is None:
+            self.trees.clear()
+        else:
+            self.trees.pop(player_no, None)
+
+
+def _rank_groups(ranks, size):
+    # the weakest group of a size for every deciding card, in strength order
+    groups = []
+    for values in ranks:
+        for top in range(size - 1, len(values)):
+            mask = 1 << values[top]
+            for value in values[:size - 1]:
+                mask |= 1 << value
+            groups.append(mask)
+    return groups
@@ -0,0 +1,118 @@
+"""
+What every player can know about a round from the plays made so far.
+
+Cards that are neither played nor in a bot's own hand are live, and the
+strongest live trick of each type is found from their masks in near constant
+time, so bots can tell which of their tricks nobody else can beat.
+
+The engine passes ``round_history`` as a ``RoundHistory``, a plain list of
+tricks that also carries a ``Knowledge`` updated after every play, so bots can
+read it in constant time instead of walking the history each turn. With any
+other history, such as the one from match.py, ``knowledge_of`` rebuilds it.
+"""
+
+from bigtwo.cards import FULL_DECK, VALUES, highest, to_mask, to_values
+from bigtwo.inference import Beliefs
+from bigtwo.moves import strongest, strongest_of_length
+from bigtwo.tricks import strength
+
+# sum of all card values from 0 to 51
+DECK_TOTAL = sum(range(52))
+
+
+class Knowledge:
+    """
+    Cards played so far in a round, as a whole and by each player, the
+    plays each player has passed on and the ``Beliefs`` drawn from them.
+    """
+
+    def __init__(self):
+        self.seen = 0
+        self.seen_count = 0
+        self.seen_total = 0
+        self.played = [0, 0, 0, 0]
+        self.passes = [[], [], [], []]
+        self.beliefs = Beliefs()
+
+    def record(self, player_no, play, play_to_beat):
+        """
+        Add a play, or a pass on ``play_to_beat`` when ``play`` is empty.
+        """
+        if not play:
+            if play_to_beat:
+                self.passes[player_no].append(to_mask(play_to_beat))
+                self.beliefs.record(player_no, 0, self.passes[player_no][-1])
+            return
+        mask = to_mask(play)
+        self.beliefs.record(player_no, mask, 0)
+        self.seen |= mask
+        self.seen_count += len(play)
+        self.seen_total += sum(VALUES[card] for card in play)
+        self.played[player_no] |= mask
+
+    @classmethod
+    def from_history(cls, round_history):
+        knowledge = cls()
+        for trick in round_history:
+            play_to_beat = []
+            for player_no, play in trick:
+                knowledge.record(player_no, play, play_to_beat)
+                if play:
+                    play_to_beat = play
+        return knowledge
+
+    @property
+    def unseen_count(self):
+        return 52 - self.seen_count
+
+    @property
+    def unseen_total(self):
+        return DECK_TOTAL - self.seen_total
+
+    def unseen_values(self):
+        return [value for value in range(52) if not self.seen >> value & 1]
+
+    def played_values(self, player_no):
+        return to_values(self.played[player_no])
+
+    def live(self, hand=()):
+        """
+        Return the mask of cards not played yet and not in ``hand``.
+        """
+        return FULL_DECK & ~self.seen & ~to_mask(hand)
+
+    def highest_live(self, hand=()):
+        """
+        Return the value of the highest live card, or -1 if there is none.
+        """
+        return highest(self.live(hand))
+
+    def strongest_live(self, kind, hand=()):
+        """
+        Return the mask of the strongest live trick of a type, or 0 if there is none.
+        """
+        return strongest(kind, self.live(hand))
+
+    def is_unbeatable(self, play, hand=()):
+        """
+        Whether no live cards can form a trick beating ``play``.
+        """
+        best = strongest_of_length(len(play), self.live(hand) & ~to_mask(play))
+        return not best or strength(best) < strength(to_mask(play))
+
+
+class RoundHistory(list):
+    """
+    A round history list with the ``Knowledge`` of the plays in it.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.knowledge = Knowledge.from_history(self)
+
+
+def knowledge_of(round_history):
+    knowledge = getattr(round_history, "knowledge", None)
+    if knowledge is None:
+        knowledge = Knowledge.from_history(round_history)
+    return knowledge
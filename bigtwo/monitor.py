@@ -0,0 +1,123 @@
+"""
+Decision timing for the players of the match engine.
+
+A ``DecisionMonitor`` wraps play functions to time every call, keeping a
+latency histogram and call counts per player, how many calls each round took
+and the slowest decisions with their full inputs. The engine only wraps the
+players of a round when given a monitor, so leaving the hook in costs nothing
+while it is off.
+"""
+
+import collections
+import copy
+import heapq
+import json
+import time
+
+
+class DecisionMonitor:
+    """
+    Latency statistics of four players, reported every ``every`` rounds to
+    ``stream`` if given, and at any time by ``report``.
+    """
+
+    def __init__(self, names=None, slowest=10, stream=None, every=100):
+        self.names = list(names) if names else ["player {}".format(player_no) for player_no in range(4)]
+        self.keep = slowest
+        self.stream = stream
+        self.every = every
+        # latency histograms in power of two buckets of nanoseconds
+        self.histograms = [[0] * 64 for _ in range(4)]
+        self.calls = [0, 0, 0, 0]
+        self.total_ns = [0, 0, 0, 0]
+        self.max_ns = [0, 0, 0, 0]
+        self.calls_per_round = [collections.Counter() for _ in range(4)]
+        self.slowest = []
+        self.rounds = 0
+        self._round_start = [0, 0, 0, 0]
+        # sequence number of the next kept call, a plain int so monitors pickle between processes
+        self._order = 0
+
+    def wrap(self, players):
+        return [self._timed(player_no, play) for player_no, play in enumerate(players)]
+
+    def _timed(self, player_no, play):
+        histogram = self.histograms[player_no]
+        clock = time.perf_counter_ns
+
+        def timed(*args):
+            started = clock()
+            chosen = play(*args)
+            elapsed = clock() - started
+            histogram[elapsed.bit_length()] += 1
+            self.calls[player_no] += 1
+            self.total_ns[player_no] += elapsed
+            if elapsed > self.max_ns[player_no]:
+                self.max_ns[player_no] = elapsed
+            if len(self.slowest) < self.keep or elapsed > self.slowest[0][0]:
+                # inputs are only copied for calls slow enough to be kept
+                entry = (elapsed, self._order, player_no, copy.deepcopy(list(args)), list(chosen or []))
+                self._order += 1
+                if len(self.slowest) < self.keep:
+                    heapq.heappush(self.slowest, entry)
+                else:
+                    heapq.heapreplace(self.slowest, entry)
+            return chosen
+        return timed
+
+    def end_round(self):
+        self.rounds += 1
+        for player_no in range(4):
+            self.calls_per_round[player_no][self.calls[player_no] - self._round_start[player_no]] += 1
+            self._round_start[player_no] = self.calls[player_no]
+        if self.stream and self.rounds % self.every == 0:
+            self.stream(self.report())
+
+    def update(self, other):
+        """
+        Add the statistics of another monitor, such as one from a worker process.
+        """
+        for player_no in range(4):
+            for bucket, count in enumerate(other.histograms[player_no]):
+                self.histograms[player_no][bucket] += count
+            self.calls[player_no] += other.calls[player_no]
+            self.total_ns[player_no] += other.total_ns[player_no]
+            self.max_ns[player_no] = max(self.max_ns[player_no], other.max_ns[player_no])
+            self.calls_per_round[player_no].update(other.calls_per_round[player_no])
+            self._round_start[player_no] = self.calls[player_no]
+        self.rounds += other.rounds
+        for elapsed, _, player_no, args, chosen in other.slowest:
+            entry = (elapsed, self._order, player_no, args, chosen)
+            self._order += 1
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, entry)
+            elif elapsed > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def report(self):
+        players = []
+        for player_no in range(4):
+            calls = self.calls[player_no]
+            rounds = sum(self.calls_per_round[player_no].values())
+            players.append({
+                "name": self.names[player_no],
+                "calls": calls,
+                "mean_us": self.total_ns[player_no] / calls / 1000 if calls else 0,
+                "max_us": self.max_ns[player_no] / 1000,
+                "calls_per_round": calls / rounds if rounds else 0,
+                "max_calls_per_round": max(self.calls_per_round[player_no], default=0),
+                # upper bound of each bucket in microseconds
+                "histogram_us": {"{:g}".format((1 << bucket) / 1000): count
+                                 for bucket, count in enumerate(self.histograms[player_no]) if count},
+            })
+        slowest = [{"name": self.names[player_no], "us": elapsed / 1000, "args": args, "play": chosen}
+                   for elapsed, _, player_no, args, chosen in sorted(self.slowest, reverse=True)]
+        return {"rounds": self.rounds, "players": players, "slowest": slowest}
+
+    def save(self, path):
+        save_report(self.report(), path)
+
+
+def save_report(report, path):
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=1)
@@ -0,0 +1,214 @@
+"""
+Legal play generation straight from the rank and suit histograms of a hand.
+"""
+
+import bisect
+import itertools
+
+from bigtwo.cards import BITS, RANK_MASKS, SUIT_MASKS, count, highest, to_values
+from bigtwo.tricks import (SINGLE, PAIR, TRIPLE, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH, INVALID,
+                           classify, strength, strength_key)
+
+# number of cards in a trick of each type
+LENGTHS = [1, 2, 3, 5, 5, 5, 5, 5]
+TYPES_OF_LENGTH = {length: [kind for kind in range(8) if LENGTHS[kind] == length] for length in (1, 2, 3, 5)}
+
+
+class Moves:
+    """
+    Every legal play that can be made from a set of cards.
+
+    Plays are card masks grouped by trick type, each group sorted by strength
+    key with the keys kept alongside in ``keys``.
+    """
+
+    def __init__(self, mask):
+        self.mask = mask
+        found = [[] for _ in range(8)]
+
+        # histograms of card values held in each rank and each suit
+        ranks = [to_values(mask & rank_mask) for rank_mask in RANK_MASKS]
+        suits = [to_values(mask & suit_mask) for suit_mask in SUIT_MASKS]
+
+        for rank, values in enumerate(ranks):
+            for value in values:
+                found[SINGLE].append((strength_key(SINGLE, value), BITS[value]))
+            for size, kind in ((2, PAIR), (3, TRIPLE)):
+                for group in itertools.combinations(values, size):
+                    found[kind].append((strength_key(kind, group[-1]), _mask_of(group)))
+
+        # straights and straight flushes run over five consecutive ranks
+        for low in range(9):
+            run = ranks[low:low + 5]
+            if all(run):
+                for group in itertools.product(*run):
+                    suit_mask = SUIT_MASKS[group[-1] % 4]
+                    group_mask = _mask_of(group)
+                    kind = STRAIGHT_FLUSH if group_mask & suit_mask == group_mask else STRAIGHT
+                    found[kind].append((strength_key(kind, group[-1]), group_mask))
+
+        # flushes that are not already straight flushes
+        for values in suits:
+            for group in itertools.combinations(values, 5):
+                if group[-1] // 4 - group[0] // 4 == 4:
+                    continue
+                found[FLUSH].append((strength_key(FLUSH, group[-1]), _mask_of(group)))
+
+        # full houses and four of a kinds decided by their triple or four
+        for rank, values in enumerate(ranks):
+            if len(values) >= 3:
+                for triple in itertools.combinations(values, 3):
+                    triple_mask = _mask_of(triple)
+                    for other, other_values in enumerate(ranks):
+                        if other != rank:
+                            for pair in itertools.combinations(other_values, 2):
+                                found[FULL_HOUSE].append((strength_key(FULL_HOUSE, triple[-1]),
+                                                          triple_mask | _mask_of(pair)))
+            if len(values) == 4:
+                rank_mask = mask & RANK_MASKS[rank]
+                for value in to_values(mask & ~rank_mask):
+                    found[FOUR_OF_A_KIND].append((strength_key(FOUR_OF_A_KIND, values[-1]),
+                                                  rank_mask | BITS[value]))
+
+        self.plays = []
+        self.keys = []
+        for group in found:
+            group.sort()
+            self.keys.append([key for key, _ in group])
+            self.plays.append([play for _, play in group])
+        self._index = None
+
+    def __len__(self):
+        return sum(map(len, self.plays))
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.plays)
+
+    def of_type(self, kind):
+        return self.plays[kind]
+
+    def of_length(self, length):
+        # five-card strength keys start with their type, so chaining keeps them sorted
+        return [play for kind in TYPES_OF_LENGTH.get(length, []) for play in self.plays[kind]]
+
+    def index(self):
+        if self._index is None:
+            self._index = PlayIndex(zip(itertools.chain.from_iterable(self.keys), self))
+        return self._index
+
+
+class PlayIndex:
+    """
+    Plays bucketed by trick length and sorted by strength key.
+
+    Plays that beat a given trick are a suffix of its length bucket, found by
+    binary search on the strength keys.
+    """
+
+    def __init__(self, keyed_plays):
+        self.keys = {length: [] for length in TYPES_OF_LENGTH}
+        self.plays = {length: [] for length in TYPES_OF_LENGTH}
+        for key, play in sorted(keyed_plays):
+            # the trick type sits above the deciding card in a strength key
+            length = LENGTHS[key >> 8]
+            self.keys[length].append(key)
+            self.plays[length].append(play)
+
+    @classmethod
+    def of(cls, plays):
+        return cls((strength(play), play) for play in plays)
+
+    def beating(self, other):
+        """
+        Return the plays that beat the trick ``other``, weakest first.
+        """
+        kind, deciding = classify(other)
+        if kind == INVALID:
+            return []
+        length = LENGTHS[kind]
+        start = bisect.bisect_right(self.keys[length], strength_key(kind, deciding))
+        return self.plays[length][start:]
+
+    def smallest_beating(self, other):
+        available = self.beating(other)
+        return available[0] if available else None
+
+    def largest_beating(self, other):
+        available = self.beating(other)
+        return available[-1] if available else None
+
+
+def strongest(kind, mask):
+    """
+    Return the strongest play of a trick type within a set of cards, or 0.
+
+    Only the rank and suit masks are looked at, so this takes near constant
+    time however many cards there are.
+    """
+    if kind <= TRIPLE:
+        for rank_mask in reversed(RANK_MASKS):
+            cards = mask & rank_mask
+            if count(cards) > kind:
+                return _top(cards, kind + 1)
+    elif kind == STRAIGHT or kind == STRAIGHT_FLUSH:
+        # the deciding card is the highest card of the top rank
+        for top in range(12, 3, -1):
+            for deciding in reversed(to_values(mask & RANK_MASKS[top])):
+                suit_mask = SUIT_MASKS[deciding % 4]
+                lower = [mask & RANK_MASKS[rank] for rank in range(top - 4, top)]
+                if kind == STRAIGHT_FLUSH:
+                    if all(cards & suit_mask for cards in lower):
+                        return BITS[deciding] | sum(_top(cards & suit_mask, 1) for cards in lower)
+                elif all(lower) and not all(cards & ~suit_mask == 0 for cards in lower):
+                    # at least one lower card off the suit keeps it from being a straight flush
+                    play = BITS[deciding]
+                    for cards in lower:
+                        play |= _top(cards & ~suit_mask or cards, 1)
+                    return play
+    elif kind == FLUSH:
+        for suit_mask in reversed(SUIT_MASKS):
+            cards = mask & suit_mask
+            while count(cards) >= 5:
+                deciding = highest(cards)
+                lower = to_values(cards ^ BITS[deciding])
+                # four lower cards from the four ranks just below would be a straight flush
+                if len(lower) > 4 or deciding // 4 - lower[0] // 4 != 4:
+                    return BITS[deciding] | _mask_of(lower[:4])
+                cards ^= BITS[deciding]
+    elif kind == FULL_HOUSE or kind == FOUR_OF_A_KIND:
+        size = 3 if kind == FULL_HOUSE else 4
+        for rank_mask in reversed(RANK_MASKS):
+            group = mask & rank_mask
+            if count(group) >= size:
+                rest = mask & ~rank_mask
+                if kind == FOUR_OF_A_KIND:
+                    return group | _top(rest, 1) if rest else 0
+                pair = strongest(PAIR, rest)
+                return _top(group, 3) | pair if pair else 0
+    return 0
+
+
+def strongest_of_length(length, mask):
+    """
+    Return the strongest play of a trick length within a set of cards, or 0.
+    """
+    for kind in reversed(TYPES_OF_LENGTH[length]):
+        play = strongest(kind, mask)
+        if play:
+            return play
+    return 0
+
+
+def _top(cards, size):
+    # the ``size`` highest cards of a mask
+    play = 0
+    for _ in range(size):
+        play |= 1 << highest(cards & ~play)
+    return play
+
+
+def _mask_of(values):
+    mask = 0
+    for value in values:
+        mask |= BITS[value]
+    return mask
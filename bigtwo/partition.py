@@ -0,0 +1,59 @@
+"""
+Optimal decomposition of a hand into tricks by memoised search over card masks.
+"""
+
+from bigtwo.cards import lowest
+from bigtwo.moves import LENGTHS, Moves
+
+
+def trick_count(play):
+    return 1
+
+
+class Partitioner:
+    """
+    Split hands into the set of tricks with the lowest total cost.
+
+    ``cost`` maps a trick mask to a number and defaults to one per trick, which
+    finds the decomposition with the fewest tricks. ``lengths`` limits the trick
+    lengths that may be used; singles are always allowed so every hand can be
+    split. The best split of a set of cards only depends on those cards, so the
+    memo table carries over between hands and turns until it reaches
+    ``memo_limit`` entries and is cleared.
+    """
+
+    def __init__(self, cost=trick_count, lengths=(1, 2, 3, 5), memo_limit=200000):
+        self.cost = cost
+        self.kinds = [kind for kind in range(8) if LENGTHS[kind] == 1 or LENGTHS[kind] in lengths]
+        self.memo_limit = memo_limit
+        self.memo = {}
+
+    def solve(self, mask):
+        """
+        Return the lowest total cost and the tricks of the best split of a hand.
+        """
+        if len(self.memo) > self.memo_limit:
+            self.memo.clear()
+
+        # the lowest card left must start the next trick, so index plays by lowest card
+        by_lowest = [[] for _ in range(52)]
+        legal_plays = Moves(mask)
+        for kind in self.kinds:
+            for play in legal_plays.plays[kind]:
+                by_lowest[lowest(play)].append((self.cost(play), play))
+        total, plays = self._solve(mask, by_lowest)
+        return total, list(plays)
+
+    def _solve(self, mask, by_lowest):
+        if not mask:
+            return 0, ()
+        if mask in self.memo:
+            return self.memo[mask]
+        best = None
+        for cost, play in by_lowest[lowest(mask)]:
+            if play & mask == play:
+                rest_cost, rest = self._solve(mask ^ play, by_lowest)
+                if best is None or cost + rest_cost < best[0]:
+                    best = cost + rest_cost, (play,) + rest
+        self.memo[mask] = best
+        return best
@@ -0,0 +1,151 @@
+"""
+Determinised Monte Carlo search over the plays of a full stage hand.
+
+Each batch deals the unseen cards to the other players in the numbers they
+hold, then plays every candidate move on the same deals and finishes the
+round with the rollout policy of ``bigtwo.simulate``. Candidates whose win
+rate is confidently below the best one are dropped after each round of
+batches, and the search stops once one candidate is left or the rollout
+budget is spent. Batches are spread over a process pool when there is more
+than one worker.
+"""
+
+import bisect
+import concurrent.futures
+import math
+import os
+import random
+
+from bigtwo.cards import count, to_cards, to_mask
+from bigtwo.knowledge import knowledge_of
+from bigtwo.moves import TYPES_OF_LENGTH, Moves
+from bigtwo.simulate import determinise, simulate
+from bigtwo.tricks import strength
+
+
+def candidate_plays(hand, play_to_beat, is_start_of_round, per_kind=4):
+    """
+    Return the plays worth searching: the weakest few of every trick type and
+    the strongest one, those holding the 3D at the start of a round, and a
+    pass when following.
+    """
+    moves = Moves(hand)
+    candidates = []
+    for kind, kind_plays in enumerate(moves.plays):
+        if play_to_beat:
+            if kind not in TYPES_OF_LENGTH[count(play_to_beat)]:
+                continue
+            kind_plays = kind_plays[bisect.bisect_right(moves.keys[kind], strength(play_to_beat)):]
+        elif is_start_of_round:
+            kind_plays = [play for play in kind_plays if play & 1]
+        for play in kind_plays[:per_kind] + kind_plays[-1:]:
+            if play not in candidates:
+                candidates.append(play)
+    return candidates + [0] if play_to_beat else candidates
+
+
+def rollout_wins(hand, seen, player_no, hand_sizes, play_to_beat, last_player, candidates, deals, seed, beliefs=None):
+    """
+    Return how many of ``deals`` random deals each candidate play wins, with
+    the deals weighted by ``beliefs`` when given.
+    """
+    rng = random.Random(seed)
+    deal = beliefs.deal if beliefs else determinise
+    wins = [0] * len(candidates)
+    for _ in range(deals):
+        dealt = deal(hand, seen, player_no, hand_sizes, rng)
+        for index, play in enumerate(candidates):
+            hands = list(dealt)
+            if not play:
+                winner = simulate(hands, player_no, play_to_beat, last_player)
+            elif play == hand:
+                winner = player_no
+            else:
+                hands[player_no] ^= play
+                winner = simulate(hands, player_no, play, player_no)
+            if winner == player_no:
+                wins[index] += 1
+    return wins
+
+
+class PIMC:
+    """
+    Choose plays by sampling, within ``rollouts`` simulated rounds per
+    decision, with the deals weighted by what passes tell when ``infer``.
+    """
+
+    def __init__(self, rollouts=2000, batch=25, workers=1, per_kind=4, z=2.58, infer=True):
+        self.rollouts = rollouts
+        self.batch = batch
+        self.workers = workers or os.cpu_count() or 1
+        self.per_kind = per_kind
+        self.z = z
+        self.infer = infer
+        self.executor = None
+        self.searches = 0
+        # rounds simulated for the last decision searched
+        self.simulated = 0
+
+    def choose(self, hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes):
+        hand_mask = to_mask(hand)
+        beat_mask = to_mask(play_to_beat)
+        candidates = candidate_plays(hand_mask, beat_mask, is_start_of_round, self.per_kind)
+        if len(candidates) == 1:
+            return to_cards(candidates[0])
+        knowledge = knowledge_of(round_history)
+        seen = knowledge.seen
+        beliefs = knowledge.beliefs if self.infer else None
+        last_player = player_to_beat(round_history, player_no)
+        self.searches += 1
+        self.simulated = 0
+
+        alive = list(range(len(candidates)))
+        wins = [0] * len(candidates)
+        deals = 0
+        batch_no = 0
+        # the first batch shrinks to fit the budget, and the search stops before a later one would overrun it
+        size = max(1, min(self.batch, self.rollouts // (self.workers * len(alive))))
+        while deals == 0 or len(alive) > 1 and self.simulated + size * self.workers * len(alive) <= self.rollouts:
+            plays = [candidates[index] for index in alive]
+            # seeds follow the state so the same decision is always searched the same way
+            seeds = ["{}:{}:{}:{}".format(hand_mask, seen, player_no, batch_no + worker)
+                     for worker in range(self.workers)]
+            batch_no += self.workers
+            args = (hand_mask, seen, player_no, hand_sizes, beat_mask, last_player, plays, size)
+            if self.workers > 1:
+                if self.executor is None:
+                    self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+                results = list(self.executor.map(rollout_wins, *zip(*[args + (seed, beliefs) for seed in seeds])))
+            else:
+                results = [rollout_wins(*args, seed, beliefs) for seed in seeds]
+            for batch_wins in results:
+                for index, won in zip(alive, batch_wins):
+                    wins[index] += won
+            deals += size * self.workers
+            self.simulated += size * self.workers * len(alive)
+
+            # drop candidates whose upper bound falls below the best lower bound
+            bounds = {index: self._bounds(wins[index], deals) for index in alive}
+            best_lower = max(lower for lower, upper in bounds.values())
+            alive = [index for index in alive if bounds[index][1] >= best_lower]
+
+        best = max(alive, key=lambda index: (wins[index], -index))
+        return to_cards(candidates[best])
+
+    def _bounds(self, wins, deals):
+        rate = wins / deals
+        half_width = self.z * math.sqrt(max(rate * (1 - rate), 1 / deals) / deals)
+        return rate - half_width, rate + half_width
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+
+
+def player_to_beat(round_history, player_no):
+    # the player who made the play to beat, or us when leading
+    for trick_player, play in reversed(round_history[-1] if round_history else []):
+        if play:
+            return trick_player
+    return player_no
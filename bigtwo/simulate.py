@@ -0,0 +1,88 @@
+"""
+Fast round simulation on card masks for sampling bots.
+
+Rollouts play the rest of a round from a given state with a cheap fixed
+policy: lead every card of the lowest rank, up to a triple or as many as the
+stage allows, and follow with the weakest play that beats the trick. Singles, pairs and triples are found
+from rank masks alone, and only 5-card tricks go through move generation.
+"""
+
+import random
+
+from bigtwo.cards import FULL_DECK, RANK_MASKS, count, to_values
+from bigtwo.moves import Moves
+
+
+def rollout_play(hand, play_to_beat, largest=3):
+    """
+    Return the policy's play for a hand mask, 0 for a pass, leading at most
+    ``largest`` cards.
+    """
+    if not play_to_beat:
+        low = hand & -hand
+        cards = hand & RANK_MASKS[(low.bit_length() - 1) >> 2]
+        while count(cards) > largest:
+            cards ^= 1 << cards.bit_length() - 1
+        return cards
+    size = count(play_to_beat)
+    deciding = play_to_beat.bit_length() - 1
+    if size == 1:
+        above = hand & -(2 << deciding)
+        return above & -above
+    if size == 5:
+        play = Moves(hand).index().smallest_beating(play_to_beat)
+        return play or 0
+    rank = deciding >> 2
+    if size == 2:
+        # a pair of the same rank beats with a card above the deciding one
+        cards = hand & RANK_MASKS[rank]
+        above = cards & -(2 << deciding)
+        if above and count(cards) >= 2:
+            top = above & -above
+            rest = cards ^ top
+            return top | rest & -rest
+    for higher in range(rank + 1, 13):
+        cards = hand & RANK_MASKS[higher]
+        if count(cards) >= size:
+            while count(cards) > size:
+                cards ^= 1 << cards.bit_length() - 1
+            return cards
+    return 0
+
+
+def simulate(hands, player_no, play_to_beat, last_player, largest=3):
+    """
+    Play out a round with the rollout policy after ``player_no`` has moved,
+    and return the winner. ``hands`` is a list of four masks, changed in place.
+    """
+    while True:
+        player_no = (player_no + 1) & 3
+        if player_no == last_player:
+            play_to_beat = 0
+        hand = hands[player_no]
+        play = rollout_play(hand, play_to_beat, largest)
+        if play:
+            hand ^= play
+            if not hand:
+                return player_no
+            hands[player_no] = hand
+            play_to_beat = play
+            last_player = player_no
+
+
+def determinise(hand, seen, player_no, hand_sizes, rng=random):
+    """
+    Deal the cards nobody has seen to the other players at random, in the
+    numbers given by ``hand_sizes``, and return the four hand masks.
+    """
+    unseen = to_values(FULL_DECK & ~seen & ~hand)
+    rng.shuffle(unseen)
+    hands = [0, 0, 0, 0]
+    hands[player_no] = hand
+    dealt = 0
+    for other in range(4):
+        if other != player_no:
+            for value in unseen[dealt:dealt + hand_sizes[other]]:
+                hands[other] |= 1 << value
+            dealt += hand_sizes[other]
+    return hands
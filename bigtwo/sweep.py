@@ -0,0 +1,121 @@
+"""
+Parallel parameter sweep for the tuning values of a bot.
+
+Every point of a parameter grid plays the same duplicate deals against the
+same opponents, in steps spread over a process pool. After each step a point
+whose win rate is confidently below the best point's is dropped, so most of
+the rounds go to the points still in contention.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import os
+import random
+
+from bigtwo.engine import STAGES, parse_number
+from bigtwo.tournament import SEATINGS, interval, play_duplicate_shard
+
+SweepPoint = collections.namedtuple("SweepPoint", "params win_rate half_width deals dropped")
+
+
+def parse_values(text):
+    """
+    Parse grid values given as ``a,b,c`` or as an inclusive range ``start:stop:step``.
+    """
+    if ':' not in text:
+        return [parse_number(value) for value in text.split(',')]
+    start, stop, step = (parse_number(value) for value in text.split(':'))
+    values = []
+    value = start
+    while value <= stop + step * 1e-9:
+        values.append(round(value, 9))
+        value = start + step * len(values)
+    return values
+
+
+def point_spec(bot, params):
+    if not params:
+        return bot
+    return bot + ':' + ','.join("{}={}".format(name, value) for name, value in params.items())
+
+
+def sweep(stage, bot, opponents, grid, step=200, max_deals=5000, workers=None, seed=None, duplicate="rotate",
+          shard_size=50, strict=True):
+    """
+    Play ``bot`` with every combination of the values in ``grid``, a dict from
+    keyword argument names to lists of values, against three opponent specs.
+
+    Returns a ``SweepPoint`` per grid point in grid order, with the win rate of
+    the bot and the half width of its 95% confidence interval.
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    points = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    seatings = len(SEATINGS[duplicate])
+    samples = [[] for _ in points]
+    dropped = [False] * len(points)
+
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        done = 0
+        while done == 0 or done < max_deals and dropped.count(False) > 1:
+            size = min(step, max_deals - done)
+            tasks = [(index, [point_spec(bot, points[index])] + list(opponents), stage, start,
+                      min(shard_size, done + size - start), seed, duplicate, strict)
+                     for index in range(len(points)) if not dropped[index]
+                     for start in range(done, done + size, shard_size)]
+            if executor:
+                results = [executor.submit(play_duplicate_shard, *task[1:]) for task in tasks]
+                results = [future.result() for future in results]
+            else:
+                results = [play_duplicate_shard(*task[1:]) for task in tasks]
+            for task, (per_deal, _) in zip(tasks, results):
+                samples[task[0]].extend(wins[0] / seatings for wins in per_deal)
+            done += size
+
+            # drop points whose upper bound falls below the best lower bound
+            bounds = {index: interval(samples[index]) for index in range(len(points)) if not dropped[index]}
+            best_lower = max(mean - half_width for mean, half_width in bounds.values())
+            for index, (mean, half_width) in bounds.items():
+                if mean + half_width < best_lower:
+                    dropped[index] = True
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return [SweepPoint(points[index], *interval(samples[index]), len(samples[index]), dropped[index])
+            for index in range(len(points))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep the tuning values of a bot against three opponents.")
+    parser.add_argument("stage", choices=sorted(STAGES))
+    parser.add_argument("bot", help="bot script path to tune")
+    parser.add_argument("opponents", nargs=3, help="opponent bot script paths, optionally followed by :test_val")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="NAME=VALUES",
+                        help="keyword argument of the bot and its values, as a,b,c or start:stop:step")
+    parser.add_argument("--step", type=int, default=200, help="deals played by every point between checks")
+    parser.add_argument("-n", "--max-deals", type=int, default=5000)
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes, default one per core")
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    parser.add_argument("-d", "--duplicate", choices=sorted(SEATINGS), default="rotate")
+    args = parser.parse_args(argv)
+
+    grid = {}
+    for param in args.param:
+        name, _, values = param.partition('=')
+        grid[name] = parse_values(values)
+    points = sweep(args.stage, args.bot, args.opponents, grid, args.step, args.max_deals, args.workers, args.seed,
+                   args.duplicate)
+    for point in sorted(points, key=lambda point: -point.win_rate):
+        print("{:<40} winning rate {:.3f} +- {:.3f} over {} deals{}".format(
+            point_spec(args.bot, point.params), point.win_rate, point.half_width, point.deals,
+            ", dropped" if point.dropped else ""))
+
+
+if __name__ == '__main__':
+    main()
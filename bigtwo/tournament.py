@@ -0,0 +1,201 @@
+"""
+Tournament runner that spreads rounds over a process pool.
+
+Rounds are played as matches of ten, each seeded from the tournament seed
+and the index of its first round, and split into shards of whole matches, so
+results only depend on the seed and not on how many workers run them.
+
+In duplicate mode every deal is instead played once for each seating of the
+bots, rotated through the seats or in all 24 orders, and wins are kept per
+deal so that bots are compared on the same cards.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import functools
+import itertools
+import math
+import os
+import random
+import time
+
+from bigtwo.engine import STAGES, deal_hands, load_player, play_match, play_round, round_rng
+from bigtwo.monitor import DecisionMonitor, save_report
+
+# rounds per match, as round_no runs from 0 to 9 in the competition
+MATCH_ROUNDS = 10
+
+# the bot sitting in each seat, for every seating of a duplicate deal
+SEATINGS = {
+    "rotate": [tuple((seat + shift) % 4 for seat in range(4)) for shift in range(4)],
+    "permute": list(itertools.permutations(range(4))),
+}
+
+TournamentResult = collections.namedtuple("TournamentResult", "win_count rounds seconds seed per_deal monitor")
+
+
+def play_shard(specs, stage, first, rounds, seed, strict=True, monitor_names=None, slowest=10):
+    """
+    Play rounds ``first`` to ``first + rounds`` of a tournament and return the
+    win count of each seat, with a ``DecisionMonitor`` of the shard's own
+    decisions when ``monitor_names`` is given, or None.
+    """
+    players = [load_player(spec) for spec in specs]
+    monitor = DecisionMonitor(monitor_names, slowest) if monitor_names else None
+    win_count = [0, 0, 0, 0]
+    for start in range(first, first + rounds, MATCH_ROUNDS):
+        match_seed = "{}/{}".format(seed, start)
+        result = play_match(players, STAGES[stage], min(MATCH_ROUNDS, first + rounds - start), match_seed,
+                            strict=strict, monitor=monitor)
+        for player_no in range(4):
+            win_count[player_no] += result.win_count[player_no]
+    return win_count, monitor
+
+
+def play_duplicate_shard(specs, stage, first, deals, seed, duplicate, strict=True, monitor_names=None, slowest=10):
+    """
+    Play deals ``first`` to ``first + deals`` in every seating and return the
+    wins of each bot for each deal, with a ``DecisionMonitor`` of the shard's
+    own decisions of each bot when ``monitor_names`` is given, or None.
+    """
+    players = [load_player(spec) for spec in specs]
+    monitor = DecisionMonitor(monitor_names, slowest) if monitor_names else None
+    if monitor:
+        players = monitor.wrap(players)
+    per_deal = []
+    for deal_no in range(first, first + deals):
+        deal = deal_hands(round_rng(seed, deal_no))
+        wins = [0, 0, 0, 0]
+        for seating in SEATINGS[duplicate]:
+            result = play_round([players[bot] for bot in seating], STAGES[stage], deal,
+                                round_no=deal_no % MATCH_ROUNDS, strict=strict)
+            wins[seating[result.winner]] += 1
+            if monitor:
+                monitor.end_round()
+        per_deal.append(wins)
+    return per_deal, monitor
+
+
+def run_tournament(specs, stage, rounds, workers=None, seed=None, shard_size=1000, strict=True, duplicate=None,
+                   monitor=None):
+    """
+    Play ``rounds`` rounds between four bots given as ``load_player`` specs and
+    return a ``TournamentResult`` with the merged win counts.
+
+    With ``duplicate`` set to "rotate" or "permute", ``rounds`` is the number
+    of deals, each played in every seating, and ``per_deal`` holds the wins of
+    each bot on each deal.
+
+    The statistics of a ``DecisionMonitor`` from every shard are merged into
+    ``monitor``, which streams its report as shards finish.
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if duplicate:
+        task = functools.partial(play_duplicate_shard, duplicate=duplicate, strict=strict)
+    else:
+        task = functools.partial(play_shard, strict=strict)
+    if monitor:
+        # every shard times its decisions on a monitor of its own that only reports back at the end
+        task = functools.partial(task, monitor_names=monitor.names, slowest=monitor.keep)
+    # shards hold whole matches, so the matches and their seeds do not depend on the shard size
+    shard_size = max(1, shard_size // MATCH_ROUNDS) * MATCH_ROUNDS
+    shards = [(start, min(shard_size, rounds - start)) for start in range(0, rounds, shard_size)]
+
+    started = time.perf_counter()
+    results = []
+    if workers == 1:
+        for start, size in shards:
+            results.append(_merge(task(specs, stage, start, size, seed), monitor))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(task, specs, stage, start, size, seed) for start, size in shards]
+            for future in futures:
+                results.append(_merge(future.result(), monitor))
+    seconds = time.perf_counter() - started
+
+    if not duplicate:
+        return TournamentResult([sum(wins) for wins in zip(*results)], rounds, seconds, seed, None, monitor)
+    per_deal = [wins for shard in results for wins in shard]
+    return TournamentResult([sum(wins) for wins in zip(*per_deal)], rounds * len(SEATINGS[duplicate]), seconds,
+                            seed, per_deal, monitor)
+
+
+def _merge(shard_result, monitor):
+    result, shard_monitor = shard_result
+    if monitor:
+        monitor.update(shard_monitor)
+        if monitor.stream:
+            monitor.stream(monitor.report())
+    return result
+
+
+def interval(samples, z=1.96):
+    """
+    Return the mean of some samples and the half width of its confidence interval.
+    """
+    mean = sum(samples) / len(samples)
+    if len(samples) < 2:
+        return mean, math.inf
+    variance = sum((sample - mean) ** 2 for sample in samples) / (len(samples) - 1)
+    return mean, z * math.sqrt(variance / len(samples))
+
+
+def win_rate(result, bot):
+    """
+    Return the win rate of a bot and the half width of its 95% confidence interval.
+    """
+    if result.per_deal is None:
+        rate = result.win_count[bot] / result.rounds
+        return rate, 1.96 * math.sqrt(rate * (1 - rate) / result.rounds)
+    seatings = result.rounds / len(result.per_deal)
+    return interval([wins[bot] / seatings for wins in result.per_deal])
+
+
+def win_rate_difference(result, bot, other):
+    """
+    Return how much more often ``bot`` wins than ``other``, paired per deal in
+    duplicate mode, and the half width of its 95% confidence interval.
+    """
+    if result.per_deal is None:
+        n = result.rounds
+        p, q = result.win_count[bot] / n, result.win_count[other] / n
+        # the two win counts of one round are multinomial, hence the covariance term
+        return p - q, 1.96 * math.sqrt((p * (1 - p) + q * (1 - q) + 2 * p * q) / n)
+    seatings = result.rounds / len(result.per_deal)
+    return interval([(wins[bot] - wins[other]) / seatings for wins in result.per_deal])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a tournament between four bots across processes.")
+    parser.add_argument("stage", choices=sorted(STAGES))
+    parser.add_argument("players", nargs=4, help="bot script paths, optionally followed by :test_val")
+    parser.add_argument("-n", "--rounds", type=int, default=10000, help="rounds, or deals in duplicate mode")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes, default one per core")
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    parser.add_argument("-d", "--duplicate", choices=sorted(SEATINGS), default=None,
+                        help="play every deal with the bots rotated through the seats or in every order")
+    parser.add_argument("--shard-size", type=int, default=1000)
+    parser.add_argument("--lenient", action="store_true", help="count illegal plays as passes instead of failing")
+    parser.add_argument("--monitor", metavar="PATH", help="time every decision, writing a JSON report as shards finish")
+    args = parser.parse_args(argv)
+
+    monitor = None
+    if args.monitor:
+        monitor = DecisionMonitor(args.players, stream=functools.partial(save_report, path=args.monitor))
+    result = run_tournament(args.players, args.stage, args.rounds, args.workers, args.seed, args.shard_size,
+                            strict=not args.lenient, duplicate=args.duplicate, monitor=monitor)
+    for player_no, wins in enumerate(result.win_count):
+        print("Player {} ({}) won {} rounds, winning rate {:.3f} +- {:.3f}".format(
+            player_no, args.players[player_no], wins, *win_rate(result, player_no)))
+    for player_no in range(1, 4):
+        print("Player {} - player 0: {:+.3f} +- {:.3f}".format(player_no, *win_rate_difference(result, player_no, 0)))
+    print("{} rounds in {:.2f}s, {:.0f} rounds per second, seed {}".format(
+        result.rounds, result.seconds, result.rounds / result.seconds, result.seed))
+
+
+if __name__ == '__main__':
+    main()
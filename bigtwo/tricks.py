@@ -0,0 +1,85 @@
+"""
+Trick classification through a precomputed rank histogram table.
+"""
+
+import itertools
+
+from bigtwo.cards import RANKS, RANK_MASKS, SUIT_MASKS, SUITS, highest
+
+# trick types from low to high, in the order five-card combos beat each other
+SINGLE, PAIR, TRIPLE, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH, INVALID = range(9)
+TYPE_NAMES = ["single", "pair", "triple",
+              "straight", "flush", "full house", "four of a kind", "straight flush", "invalid play"]
+
+# rank histograms are packed three bits per rank, so the histogram of a set of
+# cards is the sum of the keys of its cards
+RANK_KEYS = [1 << 3 * rank for rank in RANKS]
+
+
+def _build_table():
+    # map every rank histogram of up to five cards to its trick type and the
+    # rank holding the deciding card
+    table = {}
+    for size in range(1, 6):
+        for ranks in itertools.combinations_with_replacement(range(13), size):
+            counts = sorted(ranks.count(rank) for rank in set(ranks))
+            if counts[-1] > 4:
+                continue
+            key = sum(1 << 3 * rank for rank in ranks)
+            if len(counts) == 1 and size <= 3:
+                table[key] = ([SINGLE, PAIR, TRIPLE][size - 1], ranks[0])
+            elif size == 5 and counts == [1, 1, 1, 1, 1] and ranks[-1] - ranks[0] == 4:
+                table[key] = (STRAIGHT, ranks[-1])
+            elif counts == [2, 3]:
+                table[key] = (FULL_HOUSE, max(ranks, key=ranks.count))
+            elif counts == [1, 4]:
+                table[key] = (FOUR_OF_A_KIND, max(ranks, key=ranks.count))
+            else:
+                table[key] = (INVALID, ranks[-1])
+    return table
+
+
+TABLE = _build_table()
+
+
+def classify(mask):
+    """
+    Return the trick type and the value of the deciding card of a set of cards.
+
+    The deciding card is the highest card of the trick, except for full houses
+    and four of a kinds where it is the highest card of the triple or the four.
+    """
+    key = 0
+    size = 0
+    cards = mask
+    while cards:
+        low = cards & -cards
+        key += RANK_KEYS[low.bit_length() - 1]
+        size += 1
+        cards ^= low
+    if key not in TABLE:
+        return INVALID, highest(mask)
+    kind, rank = TABLE[key]
+
+    # only five cards of distinct ranks can form a flush
+    if size == 5 and mask & SUIT_MASKS[SUITS[highest(mask)]] == mask:
+        kind = STRAIGHT_FLUSH if kind == STRAIGHT else FLUSH
+    if kind == FULL_HOUSE or kind == FOUR_OF_A_KIND:
+        return kind, highest(mask & RANK_MASKS[rank])
+    return kind, highest(mask)
+
+
+def strength_key(kind, deciding):
+    """
+    Return an integer that orders tricks of the same length by strength.
+
+    Five-card combos compare by type first, and flushes compare by the suit of
+    their deciding card before its value.
+    """
+    if kind == FLUSH:
+        return kind << 8 | SUITS[deciding] * 52 + deciding
+    return kind << 8 | deciding
+
+
+def strength(mask):
+    return strength_key(*classify(mask))
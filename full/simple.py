@@ -1,216 +1,76 @@
-import itertools
+import os
+import sys
 
+# make the shared bigtwo package importable when run from the stage directory
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
 
-class Card:
-    # rank and suit order from low to high
-    rank_order = "34567890JQKA2"
-    suit_order = "DCHS"
-
-    def __init__(self, rep):
-        if type(rep) == str:
-            self.rank, self.suit = rep
-        elif type(rep) == int:
-            self.rank = Card.rank_order[int(rep / 4)]
-            self.suit = Card.suit_order[rep % 4]
-        else:
-            raise ValueError("the representation of the card is not of a valid type")
-
-    def __str__(self):
-        return self.rank + self.suit
-
-    def __lt__(self, other):
-        return self.value < other.value
-
-    def __eq__(self, other):
-        return self.value == other.value
-
-    def __gt__(self, other):
-        return self.value > other.value
-
-    @property
-    def rank_value(self):
-        return Card.rank_order.index(self.rank)
-
-    @property
-    def suit_value(self):
-        return Card.suit_order.index(self.suit)
-
-    @property
-    def value(self):
-        return self.rank_value * 4 + self.suit_value
-
-    @classmethod
-    def sort(cls, cards):
-        return sorted(cards, key=lambda c: Card(c).value)
-
-    @classmethod
-    def all(cls):
-        for rank in cls.rank_order:
-            for suit in cls.suit_order:
-                yield cls(rank + suit)
-
-
-class Trick:
-
-    sign_func = {'<': Card.__lt__, "==": Card.__eq__, '>': Card.__gt__}
-    type_rank = ["single", "pair", "triple",
-                 "straight", "flush", "full house", "four of a kind", "straight flush"]
-
-    def __init__(self, cards):
-        self.cards = list(Card.sort(cards))
-
-    def __len__(self):
-        return len(self.cards)
-
-    def _compare(self, sign, other):
-
-        if len(self) != len(other):
-            return False
-
-        # compare trick type for five-card combos
-        if len(self) == len(other) == 5:
-            if self.type != other.type:
-                if sign == '<':
-                    return self.type_rank.index(self.type) < self.type_rank.index(other.type)
-                elif sign == '>':
-                    return self.type_rank.index(self.type) > self.type_rank.index(other.type)
-
-        self_card, other_card = self.cards[-1], other.cards[-1]
-        # suit compare priority for flush only
-        if self.type == "flush":
-            if Card(self_card).suit_value != Card(other_card).suit_value:
-                if sign == '<':
-                    return Card(self_card).suit_value < Card(other_card).suit_value
-                elif sign == '>':
-                    return Card(self_card).suit_value > Card(other_card).suit_value
-
-        # compare trick for all other circumstances
-        return self.sign_func[sign](Card(self_card), Card(other_card))
-
-    def __lt__(self, other):
-        return self._compare('<', other)
-
-    def __eq__(self, other):
-        return self._compare("==", other)
-
-    def __gt__(self, other):
-        return self._compare('>', other)
-
-    def __getitem__(self, item):
-        return self.cards[item]
-
-    def __setitem__(self, key, value):
-        self.cards[key] = value
-
-    @property
-    def type(self):
-
-        # check for single, pair and triple of the same rank
-        if len(self) == 1:
-            return "single"
-        elif len(self) == 2:
-            if Card(self[0]).rank == Card(self[1]).rank:
-                return "pair"
-        elif len(self) == 3:
-            if Card(self[0]).rank == Card(self[1]).rank == Card(self[2]).rank:
-                return "triple"
-
-        # check for more complex five card combinations
-        elif len(self) == 5:
-
-            # check straight and flush
-            result = ''
-            # check for straight
-            last_card_rank = Card(self[0]).rank_value
-            for card in self.cards[1:]:
-                if Card(card).rank_value != last_card_rank + 1:
-                    break
-                last_card_rank += 1
-            else:
-                result += "straight"
-            # check for flush
-            card_suit = Card(self[0]).suit
-            for card in self.cards:
-                if Card(card).suit != card_suit:
-                    break
-            else:
-                if result:
-                    result += ' '
-                result += "flush"
-            # return one or both of straight and flush
-            if result:
-                return result
-
-            # check for full house
-            for triplet in itertools.combinations(self.cards, 3):
-                if Trick(triplet).type == "triple":
-                    double = list(filter(lambda c: c not in triplet, self.cards))
-                    if Trick(double).type == "pair":
-                        self.cards = double + list(triplet)
-                        return "full house"
-
-            # check for four of a kind
-            for quadruplet in itertools.combinations(self.cards, 4):
-                card_rank = Card(quadruplet[0]).rank_value
-                for card in quadruplet[1:]:
-                    if Card(card).rank_value != card_rank:
-                        break
-                else:
-                    single = list(filter(lambda c: c not in quadruplet, self.cards))
-                    self.cards = single + list(quadruplet)
-                    return "four of a kind"
-
-        # if none is satisfied then combination is invalid
-        return "invalid play"
+from bigtwo.cache import LRUCache  # noqa: E402
+from bigtwo.cards import CardSet, to_cards, to_mask, to_values  # noqa: E402
+from bigtwo.moves import Moves, PlayIndex  # noqa: E402
 
 
 class Hand:
 
+    # decompositions and beating plays of recently seen hands, keyed by the hand mask
+    organise_cache = LRUCache(maxsize=4096)
+    beats_cache = LRUCache(maxsize=4096)
+
     def __init__(self, cards):
-        self.cards = Card.sort(cards)
+        self.cards = CardSet(cards)
         self.strategies = []
+        self.length_limit = None
 
     def organise(self, length_limit):
-        unused_cards = self.cards.copy()
-        self.strategies = []
+        key = self.cards.mask, length_limit
+        strategies = self.organise_cache.get(key)
+        if strategies is None:
+            strategies = self._organise(length_limit)
+            self.organise_cache.put(key, strategies)
+        self.length_limit = length_limit
+        self.strategies = [list(trick) for trick in strategies]
+
+    def beats(self, other, edge=False):
+        key = self.cards.mask, self.length_limit, to_mask(other), edge
+        play_card = self.beats_cache.get(key)
+        if play_card is None:
+            play_card = self._beats(other, edge)
+            self.beats_cache.put(key, play_card)
+        return list(play_card)
+
+    def _organise(self, length_limit):
+        unused_cards = self.cards.mask
+        strategies = []
+        legal_plays = Moves(unused_cards)
         for size in [5, 3, 2, 1]:
             if size > length_limit:
                 continue
 
-            # loop to recalculate after discovery of each trick
-            loop = True
-            while loop:
-                for cards in itertools.combinations(unused_cards, size):
-                    if Trick(cards).type != "invalid play":
-                        for card in cards:
-                            unused_cards.remove(card)
-                        self.strategies.append(list(cards))
-                        break
-                else:
-                    loop = False
+            # take tricks in the order combinations of the sorted cards would find them,
+            # skipping those that share a card with a trick already taken
+            for play in sorted(legal_plays.of_length(size), key=to_values):
+                if play & unused_cards == play:
+                    unused_cards ^= play
+                    strategies.append(to_cards(play))
+        return strategies
 
-    def beats(self, other, edge=False):
-        available = []
+    def _beats(self, other, edge=False):
+        other_mask = to_mask(other)
 
-        # find available trick that beats the play
-        for trick in self.strategies:
-            if Trick(trick) > Trick(other):
-                available.append(trick)
+        # find available tricks that beat the play, weakest first
+        available = PlayIndex.of(map(to_mask, self.strategies)).beating(other_mask)
 
         # further separate hand if there is no available trick
         if not available:
             self.organise(len(other))
-            for trick in self.strategies:
-                if Trick(trick) > Trick(other):
-                    available.append(trick)
+            available = PlayIndex.of(map(to_mask, self.strategies)).beating(other_mask)
             if not available:
                 return []
 
         # play card according to priority
         if edge:
-            return available[-1]
+            return to_cards(available[-1])
         else:
-            return available[0]
+            return to_cards(available[0])
 
 
 def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no):
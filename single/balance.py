@@ -1,20 +1,33 @@
+import bisect
+import itertools
+import os
+import sys
+
+# make the shared bigtwo package importable when run from the stage directory
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from bigtwo.knowledge import knowledge_of  # noqa: E402
+
+
 class Card:
 
     # rank and suit order from low to high
     rank_order = "34567890JQKA2"
     suit_order = "DCHS"
+    # lookup tables between card strings and card values from 0 to 51
+    names = [rank + suit for rank, suit in itertools.product(rank_order, suit_order)]
+    values = {name: value for value, name in enumerate(names)}
 
     def __init__(self, rep):
         if type(rep) == str:
-            self.rank, self.suit = rep
+            self.value = Card.values[rep]
         elif type(rep) == int:
-            self.rank = Card.rank_order[int(rep / 4)]
-            self.suit = Card.suit_order[rep % 4]
+            self.value = rep
         else:
             raise ValueError("the representation of the card is not of a valid type")
 
     def __str__(self):
-        return self.rank + self.suit
+        return Card.names[self.value]
 
     def __lt__(self, other):
         return self.value < other.value
@@ -26,20 +39,30 @@ class Card:
         return self.value > other.value
 
     @property
-    def value(self):
-        rank_value = Card.rank_order.index(self.rank)
-        suit_value = Card.suit_order.index(self.suit)
-        return rank_value * 4 + suit_value
+    def rank(self):
+        return Card.names[self.value][0]
+
+    @property
+    def suit(self):
+        return Card.names[self.value][1]
+
+    @property
+    def rank_value(self):
+        return self.value // 4
+
+    @property
+    def suit_value(self):
+        return self.value % 4
 
     @classmethod
     def sort(cls, cards):
-        return sorted(cards, key=lambda c: Card(c).value)
+        return sorted(cards, key=lambda c: Card.values[c])
 
     @classmethod
     def carried(cls, cards, std):
         lower = 0
         for card in cls.sort(cards):
-            if Card(card) > Card(std):
+            if Card.values[card] > std:
                 break
             lower += 1
         higher = len(cards) - lower
@@ -47,15 +70,8 @@ class Card:
 
     @classmethod
     def other_hand_avg(cls, record):
-        other_hand_total = sum(range(52))
-        other_hand_count = 52
-        for trick in record:
-            for player, card in trick:
-                if card:
-                    card = card[0]
-                    other_hand_total -= Card(card).value
-                    other_hand_count -= 1
-        return other_hand_total / other_hand_count
+        knowledge = knowledge_of(record)
+        return knowledge.unseen_total / knowledge.unseen_count
 
 
 def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no):
@@ -74,7 +90,8 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
 
     This function should return an empty list (`[]`) to indicate a pass (see "Playing a Round"), or a list of card strings, indicating that you want to play these cards to the table as a valid play.
     """
-    my_hand = sorted(hand, key=lambda c: Card(c).value)
+    my_hand = sorted(hand, key=lambda c: Card.values[c])
+    my_values = [Card.values[card] for card in my_hand]
 
     # If we are starting a trick, we cannot pass.
     if len(play_to_beat) == 0:
@@ -87,22 +104,20 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
         return [play_card]
 
     if min(hand_sizes) == 1:
-        if Card(my_hand[-1]) > Card(play_to_beat[0]):
+        if Card.values[my_hand[-1]] > Card.values[play_to_beat[0]]:
             return [my_hand[-1]]
         else:
             return []
 
     # find the smallest card that beats opponent's play
-    for card in my_hand:
-        if Card(card) > Card(play_to_beat[0]):
-            play_card = card
-            break
-    else:
+    index = bisect.bisect_right(my_values, Card.values[play_to_beat[0]])
+    if index == len(my_hand):
         return []
+    card = play_card = my_hand[index]
 
-    my_hand_avg = int(sum([Card(c).value for c in my_hand]) / len(my_hand))
+    my_hand_avg = int(sum([Card.values[c] for c in my_hand]) / len(my_hand))
     other_hand_avg = int(Card.other_hand_avg(round_history))
-    if Card(card).value < my_hand_avg:
+    if Card.values[card] < my_hand_avg:
         return [play_card]
     if Card.carried(my_hand, other_hand_avg):
         return [play_card]
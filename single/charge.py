@@ -1,13 +1,27 @@
+import bisect
+import itertools
+import os
+import sys
+
+# make the shared bigtwo package importable when run from the stage directory
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from bigtwo.knowledge import knowledge_of  # noqa: E402
+
+
 class Card:
     # rank and suit order from low to high
     rank_order = "34567890JQKA2"
     suit_order = "DCHS"
+    # lookup tables between card strings and card values from 0 to 51
+    names = [rank + suit for rank, suit in itertools.product(rank_order, suit_order)]
+    values = {name: value for value, name in enumerate(names)}
 
     def __init__(self, rep):
-        self.rank, self.suit = rep
+        self.value = Card.values[rep]
 
     def __repr__(self):
-        return self.rank + self.suit
+        return Card.names[self.value]
 
     def __lt__(self, other):
         return self.value < other.value
@@ -19,40 +33,35 @@ class Card:
         return self.value > other.value
 
     @property
-    def value(self):
-        rank_val = Card.rank_order.index(self.rank)
-        suit_val = Card.suit_order.index(self.suit)
-        return rank_val * 4 + suit_val
+    def rank(self):
+        return Card.names[self.value][0]
+
+    @property
+    def suit(self):
+        return Card.names[self.value][1]
 
     @classmethod
     def value_to_card(cls, value):
-        rank = Card.rank_order[int(value / 4)]
-        suit = Card.suit_order[value % 4]
-        return cls(rank + suit)
+        return cls(Card.names[value])
 
     @classmethod
     def all(cls):
-        for rank in cls.rank_order:
-            for suit in cls.suit_order:
-                yield cls(rank + suit)
+        for name in cls.names:
+            yield cls(name)
 
     @classmethod
     def play_or_not(cls, my_hand, card, record):
-        other_hand_total = 1326
-        other_hand_count = 52
-        for trick_history in record:
-            for trick_play in trick_history:
-                if trick_play[1]:
-                    other_hand_total -= Card(trick_play[1][0]).value
-                    other_hand_count -= 1
+        knowledge = knowledge_of(record)
+        other_hand_total = knowledge.unseen_total
+        other_hand_count = knowledge.unseen_count
         for my_card in my_hand:
-            other_hand_total -= Card(my_card).value
+            other_hand_total -= Card.values[my_card]
             other_hand_count -= 1
         other_hand_avg = other_hand_total / other_hand_count
-        my_hand_total = sum([Card(c).value if c is not card else 0 for c in my_hand])
+        my_hand_total = sum([Card.values[c] if c is not card else 0 for c in my_hand])
         my_hand_count = len(my_hand) - 1
         my_hand_avg = my_hand_total / my_hand_count
-        return my_hand_avg > other_hand_avg - 1 or Card(card).value < my_hand_avg * .6
+        return my_hand_avg > other_hand_avg - 1 or Card.values[card] < my_hand_avg * .6
 
 
 def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no):
@@ -71,7 +80,8 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
 
     This function should return an empty list (`[]`) to indicate a pass (see "Playing a Round"), or a list of card strings, indicating that you want to play these cards to the table as a valid play.
     """
-    my_hand = sorted(hand, key=lambda card: Card(card).value)
+    my_hand = sorted(hand, key=lambda card: Card.values[card])
+    my_values = [Card.values[card] for card in my_hand]
 
     # If we are starting a trick, we cannot pass.
     if len(play_to_beat) == 0:
@@ -85,26 +95,24 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
 
     # Play more aggressive if others have fewer cards
     if min(hand_sizes) == 1:
-        if Card(my_hand[-1]) > Card(play_to_beat[0]):
+        if Card.values[my_hand[-1]] > Card.values[play_to_beat[0]]:
             return [my_hand[-1]]
 
     # play the highest card if opponent have one card
     if min(hand_sizes) == 1:
-        if Card(my_hand[-1]) > Card(play_to_beat[0]):
+        if Card.values[my_hand[-1]] > Card.values[play_to_beat[0]]:
             return my_hand[-1]
         else:
             return []
 
     # play the smallest card that beats last play
-    for card in my_hand:
-        if Card(card) > Card(play_to_beat[0]):
-            play_card = card
-            break
-    else:
+    index = bisect.bisect_right(my_values, Card.values[play_to_beat[0]])
+    if index == len(my_hand):
         return []
+    play_card = my_hand[index]
 
     # play only when you hold the highest unused card
-    if len(hand) > 8 or my_hand.index(card) < len(my_hand) - 1:
+    if len(hand) > 8 or index < len(my_hand) - 1:
         return [play_card]
     elif Card.play_or_not(my_hand, play_card, round_history):
         return [play_card]
@@ -1,13 +1,20 @@
+import bisect
+import itertools
+
+
 class Card:
     # rank and suit order from low to high
     rank_order = "34567890JQKA2"
     suit_order = "DCHS"
+    # lookup tables between card strings and card values from 0 to 51
+    names = [rank + suit for rank, suit in itertools.product(rank_order, suit_order)]
+    values = {name: value for value, name in enumerate(names)}
 
     def __init__(self, rep):
-        self.rank, self.suit = rep
+        self.value = Card.values[rep]
 
     def __repr__(self):
-        return self.rank + self.suit
+        return Card.names[self.value]
 
     def __lt__(self, other):
         return self.value < other.value
@@ -19,25 +26,24 @@ class Card:
         return self.value > other.value
 
     @property
-    def value(self):
-        rank_val = Card.rank_order.index(self.rank)
-        suit_val = Card.suit_order.index(self.suit)
-        return rank_val * 4 + suit_val
+    def rank(self):
+        return Card.names[self.value][0]
+
+    @property
+    def suit(self):
+        return Card.names[self.value][1]
 
     @classmethod
     def value_to_card(cls, value):
-        rank = Card.rank_order[int(value / 4)]
-        suit = Card.suit_order[value % 4]
-        return cls(rank + suit)
+        return cls(Card.names[value])
 
     @classmethod
     def all(cls):
-        for rank in cls.rank_order:
-            for suit in cls.suit_order:
-                yield cls(rank + suit)
+        for name in cls.names:
+            yield cls(name)
 
 
-def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no):
+def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no, margin=30):
     """
     The parameters to this function are:
     * `hand`: A list of card strings that are the card(s) in your hand.
@@ -53,7 +59,8 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
 
     This function should return an empty list (`[]`) to indicate a pass (see "Playing a Round"), or a list of card strings, indicating that you want to play these cards to the table as a valid play.
     """
-    my_hand = sorted(hand, key=lambda card: Card(card).value)
+    my_hand = sorted(hand, key=lambda card: Card.values[card])
+    my_values = [Card.values[card] for card in my_hand]
 
     # If we are starting a trick, we cannot pass.
     if len(play_to_beat) == 0:
@@ -69,14 +76,12 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
     my_hand_size = len(hand)
     other_hand_sizes = hand_sizes.copy()
     other_hand_sizes.remove(my_hand_size)
-    least = my_hand_size - min(other_hand_sizes) - 30
+    least = my_hand_size - min(other_hand_sizes) - margin
 
     # Play the smallest card that beats last play
-    for i in range(len(my_hand)):
-        if i < least:
-            continue
-        if Card(my_hand[i]) > Card(play_to_beat[0]):
-            return [my_hand[i]]
+    index = max(bisect.bisect_right(my_values, Card.values[play_to_beat[0]]), least)
+    if index < len(my_hand):
+        return [my_hand[index]]
     else:
         return []
 
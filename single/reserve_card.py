@@ -1,13 +1,20 @@
+import bisect
+import itertools
+
+
 class Card:
     # rank and suit order from low to high
     rank_order = "34567890JQKA2"
     suit_order = "DCHS"
+    # lookup tables between card strings and card values from 0 to 51
+    names = [rank + suit for rank, suit in itertools.product(rank_order, suit_order)]
+    values = {name: value for value, name in enumerate(names)}
 
     def __init__(self, rep):
-        self.rank, self.suit = rep
+        self.value = Card.values[rep]
 
     def __repr__(self):
-        return self.rank + self.suit
+        return Card.names[self.value]
 
     def __lt__(self, other):
         return self.value < other.value
@@ -19,22 +26,21 @@ class Card:
         return self.value > other.value
 
     @property
-    def value(self):
-        rank_val = Card.rank_order.index(self.rank)
-        suit_val = Card.suit_order.index(self.suit)
-        return rank_val * 4 + suit_val
+    def rank(self):
+        return Card.names[self.value][0]
+
+    @property
+    def suit(self):
+        return Card.names[self.value][1]
 
     @classmethod
     def value_to_card(cls, value):
-        rank = Card.rank_order[int(value / 4)]
-        suit = Card.suit_order[value % 4]
-        return cls(rank + suit)
+        return cls(Card.names[value])
 
     @classmethod
     def all(cls):
-        for rank in cls.rank_order:
-            for suit in cls.suit_order:
-                yield cls(rank + suit)
+        for name in cls.names:
+            yield cls(name)
 
 
 def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no, test_val):
@@ -53,7 +59,8 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
 
     This function should return an empty list (`[]`) to indicate a pass (see "Playing a Round"), or a list of card strings, indicating that you want to play these cards to the table as a valid play.
     """
-    my_hand = sorted(hand, key=lambda card: Card(card).value)
+    my_hand = sorted(hand, key=lambda card: Card.values[card])
+    my_values = [Card.values[card] for card in my_hand]
 
     # If we are starting a trick, we cannot pass.
     if len(play_to_beat) == 0:
@@ -67,19 +74,18 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
 
     # Play more aggressive if others have fewer cards
     if min(hand_sizes) == 1:
-        if Card(my_hand[-1]) > Card(play_to_beat[0]):
+        if Card.values[my_hand[-1]] > Card.values[play_to_beat[0]]:
             return [my_hand[-1]]
 
     # Play the smallest card that beats last play
-    for card in my_hand:
-        if Card(card) > Card(play_to_beat[0]):
-            play_card = [card]
-            break
-    else:
+    index = bisect.bisect_right(my_values, Card.values[play_to_beat[0]])
+    if index == len(my_hand):
         return []
+    card = my_hand[index]
+    play_card = [card]
 
     # reserve card if others have more cards and card value is high
-    if Card(card).value + min(hand_sizes) * 4 > test_val:
+    if Card.values[card] + min(hand_sizes) * 4 > test_val:
         return []
     else:
         return play_card
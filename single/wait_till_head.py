@@ -1,13 +1,27 @@
+import bisect
+import itertools
+import os
+import sys
+
+# make the shared bigtwo package importable when run from the stage directory
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from bigtwo.knowledge import knowledge_of  # noqa: E402
+
+
 class Card:
     # rank and suit order from low to high
     rank_order = "34567890JQKA2"
     suit_order = "DCHS"
+    # lookup tables between card strings and card values from 0 to 51
+    names = [rank + suit for rank, suit in itertools.product(rank_order, suit_order)]
+    values = {name: value for value, name in enumerate(names)}
 
     def __init__(self, rep):
-        self.rank, self.suit = rep
+        self.value = Card.values[rep]
 
     def __repr__(self):
-        return self.rank + self.suit
+        return Card.names[self.value]
 
     def __lt__(self, other):
         return self.value < other.value
@@ -19,31 +33,25 @@ class Card:
         return self.value > other.value
 
     @property
-    def value(self):
-        rank_val = Card.rank_order.index(self.rank)
-        suit_val = Card.suit_order.index(self.suit)
-        return rank_val * 4 + suit_val
+    def rank(self):
+        return Card.names[self.value][0]
+
+    @property
+    def suit(self):
+        return Card.names[self.value][1]
 
     @classmethod
     def value_to_card(cls, value):
-        rank = Card.rank_order[int(value / 4)]
-        suit = Card.suit_order[value % 4]
-        return cls(rank + suit)
+        return cls(Card.names[value])
 
     @classmethod
     def all(cls):
-        for rank in cls.rank_order:
-            for suit in cls.suit_order:
-                yield cls(rank + suit)
+        for name in cls.names:
+            yield cls(name)
 
     @classmethod
     def is_head(cls, card, record):
-        larger_count = 0
-        for trick_history in record:
-            for trick_play in trick_history:
-                if trick_play[1] and Card(trick_play[1][0]).value > Card(card).value:
-                    larger_count += 1
-        return 51 - Card(card).value == larger_count
+        return knowledge_of(record).is_unbeatable([card])
 
 
 def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no):
@@ -62,7 +70,8 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
 
     This function should return an empty list (`[]`) to indicate a pass (see "Playing a Round"), or a list of card strings, indicating that you want to play these cards to the table as a valid play.
     """
-    my_hand = sorted(hand, key=lambda card: Card(card).value)
+    my_hand = sorted(hand, key=lambda card: Card.values[card])
+    my_values = [Card.values[card] for card in my_hand]
 
     # If we are starting a trick, we cannot pass.
     if len(play_to_beat) == 0:
@@ -76,16 +85,14 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
 
     # Play more aggressive if others have fewer cards
     if min(hand_sizes) == 1:
-        if Card(my_hand[-1]) > Card(play_to_beat[0]):
+        if Card.values[my_hand[-1]] > Card.values[play_to_beat[0]]:
             return [my_hand[-1]]
 
     # Play the smallest card that beats last play
-    for card in my_hand:
-        if Card(card) > Card(play_to_beat[0]):
-            play_card = [card]
-            break
-    else:
+    index = bisect.bisect_right(my_values, Card.values[play_to_beat[0]])
+    if index == len(my_hand):
         return []
+    play_card = [my_hand[index]]
 
     # play only when you hold the highest unused card
     my_highest = hand[-1]
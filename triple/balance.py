@@ -1,22 +1,33 @@
 import itertools
+import operator
+import os
+import sys
+
+# make the shared bigtwo package importable when run from the stage directory
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from bigtwo.cards import CardSet  # noqa: E402
 
 
 class Card:
     # rank and suit order from low to high
     rank_order = "34567890JQKA2"
     suit_order = "DCHS"
+    # lookup tables between card strings and card values from 0 to 51
+    names = [rank + suit for rank, suit in itertools.product(rank_order, suit_order)]
+    values = {name: value for value, name in enumerate(names)}
+    rank_values = {name: value // 4 for value, name in enumerate(names)}
 
     def __init__(self, rep):
         if type(rep) == str:
-            self.rank, self.suit = rep
+            self.value = Card.values[rep]
         elif type(rep) == int:
-            self.rank = Card.rank_order[int(rep / 4)]
-            self.suit = Card.suit_order[rep % 4]
+            self.value = rep
         else:
             raise ValueError("the representation of the card is not of a valid type")
 
     def __str__(self):
-        return self.rank + self.suit
+        return Card.names[self.value]
 
     def __lt__(self, other):
         return self.value < other.value
@@ -28,31 +39,34 @@ class Card:
         return self.value > other.value
 
     @property
-    def rank_value(self):
-        return Card.rank_order.index(self.rank)
+    def rank(self):
+        return Card.names[self.value][0]
 
     @property
-    def suit_value(self):
-        return Card.suit_order.index(self.suit)
+    def suit(self):
+        return Card.names[self.value][1]
 
     @property
-    def value(self):
-        return self.rank_value * 4 + self.suit_value
+    def rank_value(self):
+        return self.value // 4
+
+    @property
+    def suit_value(self):
+        return self.value % 4
 
     @classmethod
     def sort(cls, cards):
-        return sorted(cards, key=lambda c: Card(c).value)
+        return sorted(cards, key=lambda c: Card.values[c])
 
     @classmethod
     def all(cls):
-        for rank in cls.rank_order:
-            for suit in cls.suit_order:
-                yield cls(rank + suit)
+        for name in cls.names:
+            yield cls(name)
 
 
 class Trick:
 
-    sign_func = {'<': Card.__lt__, "==": Card.__eq__, '>': Card.__gt__}
+    sign_func = {'<': operator.lt, "==": operator.eq, '>': operator.gt}
 
     def __init__(self, cards):
         self.cards = list(Card.sort(cards))
@@ -67,7 +81,7 @@ class Trick:
 
         # compare trick for all other circumstances
         self_card, other_card = self.cards[-1], other.cards[-1]
-        return self.sign_func[sign](Card(self_card), Card(other_card))
+        return self.sign_func[sign](Card.values[self_card], Card.values[other_card])
 
     def __lt__(self, other):
         return self._compare('<', other)
@@ -91,10 +105,10 @@ class Trick:
         if len(self) == 1:
             return "single"
         elif len(self) == 2:
-            if Card(self[0]).rank == Card(self[1]).rank:
+            if Card.rank_values[self[0]] == Card.rank_values[self[1]]:
                 return "pair"
         elif len(self) == 3:
-            if Card(self[0]).rank == Card(self[1]).rank == Card(self[2]).rank:
+            if Card.rank_values[self[0]] == Card.rank_values[self[1]] == Card.rank_values[self[2]]:
                 return "triple"
 
         # if none is satisfied then combination is invalid
@@ -102,22 +116,26 @@ class Trick:
 
     @property
     def value(self):
-        card_values = [Card(c).value for c in self.cards]
+        card_values = [Card.values[c] for c in self.cards]
         return sum(card_values) / len(card_values)
 
 
 class Hand:
 
-    def __init__(self, cards):
-        self.cards = Card.sort(cards)
+    def __init__(self, cards, low_value=25.5, reserve_value=44):
+        self.cards = CardSet(cards)
         self.strategies = []
+        # tricks worth less than low_value count as low ones, and tricks worth reserve_value or more
+        # are held back while everyone has seven cards or more
+        self.low_value = low_value
+        self.reserve_value = reserve_value
 
     @property
     def type_count(self):
         type_no = {"single": 1, "pair": 2, "triple": 3}
         count = {"single": [0, 0], "pair": [0, 0], "triple": [0, 0]}
         for cards in self.strategies:
-            if Trick(cards).value < 25.5:
+            if Trick(cards).value < self.low_value:
                 count[Trick(cards).type][0] += 1
             else:
                 count[Trick(cards).type][1] += 1
@@ -165,13 +183,14 @@ class Hand:
         # play card according to priority
         if min(hand_size) == len(other):
             return available[-1]
-        elif min(hand_size) >= 7 and Trick(available[0]).value >= 44:
+        elif min(hand_size) >= 7 and Trick(available[0]).value >= self.reserve_value:
             return []
         else:
             return available[0]
 
 
-def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no):
+def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no,
+         low_value=25.5, reserve_value=44):
     """
     The parameters to this function are:
     * `hand`: A list of card strings that are the card(s) in your hand.
@@ -187,7 +206,7 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
 
     This function should return an empty list (`[]`) to indicate a pass (see "Playing a Round"), or a list of card strings, indicating that you want to play these cards to the table as a valid play.
     """
-    my_hand = Hand(hand)
+    my_hand = Hand(hand, low_value, reserve_value)
     my_hand.organise()
 
     # start of a trick
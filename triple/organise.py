@@ -1,13 +1,27 @@
+import itertools
+import os
+import sys
+
+# make the shared bigtwo package importable when run from the stage directory
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from bigtwo.cards import BITS, RANK_MASKS, lowest, to_cards, to_values  # noqa: E402
+from bigtwo.incremental import IncrementalOrganiser, same_ranks  # noqa: E402
+
+
 class Card:
     # rank and suit order from low to high
     rank_order = "34567890JQKA2"
     suit_order = "DCHS"
+    # lookup tables between card strings and card values from 0 to 51
+    names = [rank + suit for rank, suit in itertools.product(rank_order, suit_order)]
+    values = {name: value for value, name in enumerate(names)}
 
     def __init__(self, rep):
-        self.rank, self.suit = rep
+        self.value = Card.values[rep]
 
     def __repr__(self):
-        return self.rank + self.suit
+        return Card.names[self.value]
 
     def __lt__(self, other):
         return self.value < other.value
@@ -19,28 +33,27 @@ class Card:
         return self.value > other.value
 
     @property
-    def value(self):
-        rank_val = Card.rank_order.index(self.rank)
-        suit_val = Card.suit_order.index(self.suit)
-        return rank_val * 4 + suit_val
+    def rank(self):
+        return Card.names[self.value][0]
+
+    @property
+    def suit(self):
+        return Card.names[self.value][1]
 
     @classmethod
     def value_to_card(cls, value):
-        rank = Card.rank_order[int(value / 4)]
-        suit = Card.suit_order[value % 4]
-        return cls(rank + suit)
+        return cls(Card.names[value])
 
     @classmethod
     def all(cls):
-        for rank in cls.rank_order:
-            for suit in cls.suit_order:
-                yield cls(rank + suit)
+        for name in cls.names:
+            yield cls(name)
 
 
 class Trick:
 
     def __init__(self, cards):
-        self.cards = sorted(cards, key=lambda card: Card(card).value)
+        self.cards = sorted(cards, key=lambda card: Card.values[card])
 
     def __len__(self):
         return len(self.cards)
@@ -62,13 +75,18 @@ class Trick:
 
     @property
     def value(self):
-        return sum([Card(c).value for c in self.cards])
+        return sum([Card.values[c] for c in self.cards])
 
 
 class Hand:
 
+    # decompositions kept across the turns of a round, one organiser for each trick length
+    round_organisers = {trick_len: IncrementalOrganiser(lambda mask, trick_len=trick_len: Hand.group(mask, trick_len),
+                                                        affected=same_ranks)
+                        for trick_len in (1, 2, 3)}
+
     def __init__(self, cards):
-        self.cards = sorted(cards, key=lambda c: Card(c).value)
+        self.cards = sorted(cards, key=lambda c: Card.values[c])
         self.strategies = []
 
     def organise(self, trick_len):
@@ -84,6 +102,21 @@ class Hand:
                 self.strategies.append([card])
             index += 1
 
+    def organise_round(self, trick_len, player_no, round_no):
+        organiser = self.round_organisers[trick_len]
+        tricks = organiser.organise(sum(BITS[Card.values[card]] for card in self.cards), player_no, round_no)
+        self.strategies = [to_cards(trick) for trick in sorted(tricks, key=lowest)]
+
+    @staticmethod
+    def group(mask, trick_len):
+        # split the cards of each rank into tricks of up to trick_len cards, as organise does
+        tricks = []
+        for rank_mask in RANK_MASKS:
+            values = to_values(mask & rank_mask)
+            for start in range(0, len(values), trick_len):
+                tricks.append(sum(BITS[value] for value in values[start:start + trick_len]))
+        return tricks
+
     def beats(self, other, edge=False):
         available = []
         for trick in self.strategies:
@@ -119,7 +152,7 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
     This function should return an empty list (`[]`) to indicate a pass (see "Playing a Round"), or a list of card strings, indicating that you want to play these cards to the table as a valid play.
     """
     my_hand = Hand(hand)
-    my_hand.organise(2)
+    my_hand.organise_round(2, player_no, round_no)
 
     # If we are starting a trick, we cannot pass.
     if len(play_to_beat) == 0:
@@ -1,13 +1,19 @@
+import itertools
+
+
 class Card:
     # rank and suit order from low to high
     rank_order = "34567890JQKA2"
     suit_order = "DCHS"
+    # lookup tables between card strings and card values from 0 to 51
+    names = [rank + suit for rank, suit in itertools.product(rank_order, suit_order)]
+    values = {name: value for value, name in enumerate(names)}
 
     def __init__(self, rep):
-        self.rank, self.suit = rep
+        self.value = Card.values[rep]
 
     def __repr__(self):
-        return self.rank + self.suit
+        return Card.names[self.value]
 
     def __lt__(self, other):
         return self.value < other.value
@@ -19,28 +25,27 @@ class Card:
         return self.value > other.value
 
     @property
-    def value(self):
-        rank_val = Card.rank_order.index(self.rank)
-        suit_val = Card.suit_order.index(self.suit)
-        return rank_val * 4 + suit_val
+    def rank(self):
+        return Card.names[self.value][0]
+
+    @property
+    def suit(self):
+        return Card.names[self.value][1]
 
     @classmethod
     def value_to_card(cls, value):
-        rank = Card.rank_order[int(value / 4)]
-        suit = Card.suit_order[value % 4]
-        return cls(rank + suit)
+        return cls(Card.names[value])
 
     @classmethod
     def all(cls):
-        for rank in cls.rank_order:
-            for suit in cls.suit_order:
-                yield cls(rank + suit)
+        for name in cls.names:
+            yield cls(name)
 
 
 class Trick:
 
     def __init__(self, cards):
-        self.cards = sorted(cards, key=lambda card: Card(card).value)
+        self.cards = sorted(cards, key=lambda card: Card.values[card])
 
     def __len__(self):
         return len(self.cards)
@@ -62,13 +67,13 @@ class Trick:
 
     @property
     def value(self):
-        return sum([Card(c).value for c in self.cards])
+        return sum([Card.values[c] for c in self.cards])
 
 
 class Hand:
 
     def __init__(self, cards):
-        self.cards = sorted(cards, key=lambda c: Card(c).value)
+        self.cards = sorted(cards, key=lambda c: Card.values[c])
         self.strategies = []
 
     def organise(self, trick_len):
@@ -96,7 +101,8 @@ class Hand:
             return available[0]
 
 
-def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no):
+def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_sizes, scores, round_no,
+         reserve_limit=85):
     """
     The parameters to this function are:
     * `hand`: A list of card strings that are the card(s) in your hand.
@@ -136,7 +142,7 @@ def play(hand, is_start_of_round, play_to_beat, round_history, player_no, hand_s
         play_card = my_hand.beats(play_to_beat)
 
     # reserve card if others have more cards and card value is high
-    if Trick(play_card).value + sum(hand_sizes) > 85:
+    if Trick(play_card).value + sum(hand_sizes) > reserve_limit:
         return []
     else:
         return play_card